@@ -4,7 +4,7 @@ Debug version of live_eeg_stream.py - tries all notify characteristics
 
 import asyncio
 from bleak import BleakScanner, BleakClient
-from process import decode_serenibrain_packet
+from process import decode_serenibrain_packet, quick_is_serenibrain
 
 async def test_all_characteristics(device_address):
     """Test all notify characteristics to find the right one"""
@@ -15,6 +15,13 @@ async def test_all_characteristics(device_address):
         
         notify_chars = []
         
+        # Issue all reads at once so they pipeline over the connection
+        readable = [char for service in client.services for char in service.characteristics
+                    if "read" in char.properties]
+        values = await asyncio.gather(*(client.read_gatt_char(char.uuid) for char in readable),
+                                      return_exceptions=True)
+        read_results = dict(zip(readable, values))
+        
         for service in client.services:
             print(f"\n{'='*70}")
             print(f"Service: {service.uuid}")
@@ -30,12 +37,12 @@ async def test_all_characteristics(device_address):
                     notify_chars.append((service.uuid, char.uuid, char.description))
                     print(f"    ✓ Can notify")
                 
-                if "read" in char.properties:
-                    try:
-                        value = await client.read_gatt_char(char.uuid)
+                if char in read_results:
+                    value = read_results[char]
+                    if isinstance(value, Exception):
+                        print(f"    Read failed: {value}")
+                    else:
                         print(f"    Read value: {value.hex()}")
-                    except Exception as e:
-                        print(f"    Read failed: {e}")
         
         print(f"\n{'='*70}")
         print(f"\nFound {len(notify_chars)} notify characteristic(s)")
@@ -44,48 +51,73 @@ async def test_all_characteristics(device_address):
             print("No notify characteristics found!")
             return
         
-        # Test each notify characteristic
-        for i, (service_uuid, char_uuid, desc) in enumerate(notify_chars):
-            print(f"\n{'='*70}")
-            print(f"Testing characteristic {i+1}/{len(notify_chars)}")
-            print(f"Service: {service_uuid}")
-            print(f"Char: {char_uuid}")
-            print(f"Description: {desc}")
-            print(f"{'='*70}")
-            
-            packet_count = [0]  # Use list to allow modification in closure
-            
+        # Subscribe to every notify characteristic at once and watch them all
+        # during a single 5 second window
+        print(f"\n{'='*70}")
+        print(f"Testing {len(notify_chars)} characteristic(s) concurrently")
+        for service_uuid, char_uuid, desc in notify_chars:
+            print(f"  Service: {service_uuid}  Char: {char_uuid}  ({desc})")
+        print(f"{'='*70}")
+        
+        counts = {char_uuid: 0 for _, char_uuid, _ in notify_chars}
+        winner = []
+        first_valid = asyncio.Event()
+        
+        def make_handler(char_uuid):
             def handler(sender, data):
-                packet_count[0] += 1
-                print(f"\n[Packet {packet_count[0]}] Received {len(data)} bytes")
+                counts[char_uuid] += 1
+                print(f"\n[{char_uuid} packet {counts[char_uuid]}] Received {len(data)} bytes")
                 print(f"Hex: {data.hex()}")
                 
                 # Try to decode
+                if not quick_is_serenibrain(data):
+                    print("✗ Decode skipped: no DATA header")
+                    return
                 try:
                     packet = decode_serenibrain_packet(data)
                     print(f"✓ Valid packet! Type: 0x{packet['packet_type']:02X}")
                     if packet['packet_type'] == 2:
-                        print(f"  Samples: {len(packet['samples'])}")
+                        print(f"  Samples: {packet['num_samples']}")
+                    if not first_valid.is_set():
+                        winner.append(char_uuid)
+                        first_valid.set()
                 except Exception as e:
                     print(f"✗ Decode failed: {e}")
-            
+            return handler
+        
+        subscribed = []
+        results = await asyncio.gather(
+            *(client.start_notify(char_uuid, make_handler(char_uuid)) for char_uuid in counts),
+            return_exceptions=True)
+        for char_uuid, result in zip(counts, results):
+            if isinstance(result, Exception):
+                print(f"Error subscribing to {char_uuid}: {result}")
+            else:
+                subscribed.append(char_uuid)
+        
+        if subscribed:
+            print("Subscribed! Waiting up to 5 seconds for data...")
             try:
-                await client.start_notify(char_uuid, handler)
-                print("Subscribed! Waiting 5 seconds for data...")
-                await asyncio.sleep(5)
-                await client.stop_notify(char_uuid)
-                
-                print(f"\nResult: Received {packet_count[0]} packets")
-                
-                if packet_count[0] > 0:
-                    print(f"\n✓✓✓ THIS IS THE RIGHT CHARACTERISTIC! ✓✓✓")
-                    print(f"Use: --uuid {char_uuid}")
-                    return char_uuid
-                else:
-                    print("No data received from this characteristic")
-                    
-            except Exception as e:
-                print(f"Error testing characteristic: {e}")
+                await asyncio.wait_for(first_valid.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.gather(*(client.stop_notify(char_uuid) for char_uuid in subscribed),
+                                 return_exceptions=True)
+        
+        print("\nResults:")
+        for char_uuid in subscribed:
+            print(f"  {char_uuid}: {counts[char_uuid]} packets")
+        
+        # Prefer the first characteristic to deliver a decodable packet,
+        # otherwise whichever produced the most data
+        busiest = max(subscribed, key=counts.get, default=None)
+        if not winner and busiest is not None and counts[busiest] > 0:
+            winner.append(busiest)
+        
+        if winner:
+            print(f"\n✓✓✓ THIS IS THE RIGHT CHARACTERISTIC! ✓✓✓")
+            print(f"Use: --uuid {winner[0]}")
+            return winner[0]
         
         print("\n" + "="*70)
         print("No characteristic produced data!")
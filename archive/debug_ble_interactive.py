@@ -16,6 +16,13 @@ async def explore_device(address):
         # List all services and characteristics
         services_data = []
         
+        # Issue all reads at once so they pipeline over the connection
+        readable = [char for service in client.services for char in service.characteristics
+                    if "read" in char.properties]
+        values = await asyncio.gather(*(client.read_gatt_char(char.uuid) for char in readable),
+                                      return_exceptions=True)
+        read_results = dict(zip(readable, values))
+        
         for service in client.services:
             print(f"\n{'='*70}")
             print(f"SERVICE: {service.uuid}")
@@ -33,14 +40,14 @@ async def explore_device(address):
                     'description': char.description
                 }
                 
-                # Try to read if readable
-                if "read" in char.properties:
-                    try:
-                        value = await client.read_gatt_char(char.uuid)
+                # Show read result if readable
+                if char in read_results:
+                    value = read_results[char]
+                    if isinstance(value, Exception):
+                        print(f"    Read error: {value}")
+                    else:
                         print(f"    Read: {value.hex()}")
                         char_info['read_value'] = value.hex()
-                    except Exception as e:
-                        print(f"    Read error: {e}")
                 
                 services_data.append(char_info)
         
@@ -72,12 +79,13 @@ async def explore_device(address):
             for i, char_info in enumerate(notify_chars):
                 print(f"\nTesting [{i}] {char_info['uuid']}...")
                 
-                received = [0]
+                received = 0
                 
                 def handler(sender, data):
-                    received[0] += 1
-                    if received[0] <= 3:  # Show first 3 packets
-                        print(f"  Packet {received[0]}: {len(data)} bytes - {data.hex()[:60]}...")
+                    nonlocal received
+                    received += 1
+                    if received <= 3:  # Show first 3 packets
+                        print(f"  Packet {received}: {len(data)} bytes - {data.hex()[:60]}...")
                 
                 try:
                     # Try sending start commands to common writable characteristics
@@ -97,8 +105,8 @@ async def explore_device(address):
                     await asyncio.sleep(3)
                     await client.stop_notify(char_info['uuid'])
                     
-                    if received[0] > 0:
-                        print(f"  ✓✓✓ SUCCESS! Received {received[0]} packets")
+                    if received > 0:
+                        print(f"  ✓✓✓ SUCCESS! Received {received} packets")
                         print(f"\n  Use this UUID: {char_info['uuid']}")
                     else:
                         print(f"  No data received")
@@ -5,62 +5,100 @@ Assumes frames_with_time.jsonl exists (created by extract_frames_times.js).
 Uses candidate int16 offsets [30,44,58] (based on prior analysis). Computes PSD and band power
 for the first 6 seconds of data and writes plots to tools/plots/.
 """
-import os, json, math
+import os, json, math, binascii, mmap
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from scipy.fft import rfft, rfftfreq
+try:
+    from numba import njit
+except ImportError:  # numba is optional; extract_int16 falls back to a NumPy gather
+    njit = None
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json accepts bytes too
+    json_loads = json.loads
 
 ROOT = os.path.dirname(__file__)
 FRAMES_PATH = os.path.join(ROOT, 'frames_with_time.jsonl')
 OUTDIR = os.path.join(ROOT, 'plots')
+# bytes.translate delete table: strips the '-' separators (and anything else non-hex)
+NON_HEX = bytes(c for c in range(256) if chr(c) not in '0123456789abcdefABCDEF')
 os.makedirs(OUTDIR, exist_ok=True)
 
 if not os.path.exists(FRAMES_PATH):
     print('Missing', FRAMES_PATH, '- run tools/extract_frames_times.js first')
     raise SystemExit(2)
 
-frames = [json.loads(l) for l in open(FRAMES_PATH,'r',encoding='utf8').read().strip().splitlines()]
-print('Loaded', len(frames), 'frames')
+# parse lines straight out of the mapped file (no read()/splitlines() copies),
+# keeping only the two fields used below as parallel lists
+ts_list = []
+hex_list = []
+with open(FRAMES_PATH, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+    for line in iter(mm.readline, b''):
+        if not line.strip():
+            continue
+        obj = json_loads(line)
+        ts_list.append(obj['ts'])
+        hex_list.append(obj['hex'])
+n_frames = len(ts_list)
+print('Loaded', n_frames, 'frames')
 
 # candidate offsets (int16) to try as 3 electrodes
 offsets = [30,44,58]
 
-times = np.array([f['ts'] for f in frames], dtype=float)/1000.0
+times = np.fromiter(ts_list, dtype=float, count=n_frames)/1000.0
 dt = np.diff(times)
 median_dt = np.median(dt)
 fs = 1.0/median_dt if median_dt>0 else None
 print(f'Estimated frame rate (median): {fs:.3f} Hz')
 
-# extract channel values (int16) per frame, set to nan if missing
-ch_vals = {o: [] for o in offsets}
-for f in frames:
-    # clean hex string (remove spaces/dashes)
-    import re
-    cleaned = re.sub(r'[^0-9A-Fa-f]', '', f['hex'])
-    buf = bytes.fromhex(cleaned)
-    for o in offsets:
-        if o+2 <= len(buf):
-            # little-endian int16
-            v = int.from_bytes(buf[o:o+2],'little',signed=True)
-        else:
-            v = float('nan')
-        ch_vals[o].append(v)
-
-ch_arrays = {o: np.array(ch_vals[o], dtype=float) for o in offsets}
+def _extract_int16_loop(buf, frame_len, offsets, out):
+    # little-endian int16 at each offset of each fixed-length row of buf
+    for i in range(out.shape[0]):
+        base = i * frame_len
+        for j in range(offsets.shape[0]):
+            k = base + offsets[j]
+            out[i, j] = np.int16(buf[k] | (np.uint16(buf[k + 1]) << 8))
+
+def _extract_int16_numpy(buf, frame_len, offsets, out):
+    # gather the (lo, hi) byte pair of every offset in one index, so each
+    # row of the result is already the little-endian int16 layout
+    pairs = np.stack([offsets, offsets + 1], axis=1).ravel()
+    out[:] = np.take(buf.reshape(-1, frame_len), pairs, axis=1).view('<i2')
+
+if njit is not None:
+    extract_int16 = njit(cache=True, boundscheck=False)(_extract_int16_loop)
+else:
+    extract_int16 = _extract_int16_numpy
+
+# extract channel values (int16) per frame, set to nan if missing.
+# All frames are decoded into one contiguous, zero-padded buffer so the int16
+# columns can be pulled out in a single pass.
+raw_frames = [binascii.unhexlify(h.encode('ascii').translate(None, NON_HEX)) for h in hex_list]
+frame_lens = np.array([len(b) for b in raw_frames], dtype=np.int64)
+frame_len = max(int(frame_lens.max()) if len(raw_frames) else 0, max(offsets) + 2)
+buf = bytearray(frame_len * len(raw_frames))
+for i, b in enumerate(raw_frames):
+    buf[i*frame_len:i*frame_len + len(b)] = b
+
+out = np.empty((len(raw_frames), len(offsets)), dtype=np.int16)
+extract_int16(np.frombuffer(buf, dtype=np.uint8), frame_len, np.array(offsets, dtype=np.int64), out)
+ch_arrays = out.T.astype(float)
+# frames too short to contain an offset are padding, not data
+ch_arrays[frame_lens[None, :] < np.array(offsets)[:, None] + 2] = np.nan
 
 # Build a mask of frames where all channels have data
-valid_mask = np.ones(len(frames), dtype=bool)
-for o in offsets:
-    valid_mask &= ~np.isnan(ch_arrays[o])
+valid_mask = ~np.isnan(ch_arrays).any(axis=0)
 
 if not valid_mask.any():
     print('No frames with all candidate offsets present')
     raise SystemExit(3)
 
-# restrict to frames where all channels present
-times_valid = times[valid_mask]
-ch_data = np.vstack([ch_arrays[o][valid_mask] for o in offsets])
+# restrict to frames where all channels present, as frame indices
+sel = np.flatnonzero(valid_mask)
+times_valid = times[sel]
 
 # choose first 6 seconds window
 start_t = times_valid[0]
@@ -68,10 +106,12 @@ end_t = start_t + 6.0
 window_mask = (times_valid >= start_t) & (times_valid < end_t)
 if window_mask.sum() < 8:
     print('Not enough samples in 6s window, using all valid frames')
-    window_mask = np.ones_like(times_valid, dtype=bool)
+else:
+    sel = sel[window_mask]
 
-ts = times_valid[window_mask]
-data = ch_data[:, window_mask]
+# gather all channels for the selected frames in one fancy-indexing copy
+ts = times[sel]
+data = ch_arrays[:, sel]
 N = data.shape[1]
 fs_actual = 1.0/np.median(np.diff(ts)) if N>1 else fs
 print(f'Using {N} samples over {ts[0]:.3f}..{ts[-1]:.3f} s, fs ~ {fs_actual:.3f} Hz')
@@ -87,11 +127,15 @@ png_ts = os.path.join(OUTDIR, 'reconstructed_timeseries.png')
 plt.tight_layout(); plt.savefig(png_ts)
 print('Wrote', png_ts)
 
-# compute PSD via periodogram (rfft)
+# compute PSD via periodogram (rfft) along the last axis, all channels in one call
 def compute_psd(x, fs):
-    X = np.fft.rfft(x * np.hanning(len(x)))
-    psd = (np.abs(X)**2) / (len(x)*fs)
-    freqs = np.fft.rfftfreq(len(x), d=1.0/fs)
+    n = x.shape[-1]
+    win = np.hanning(n)
+    X = rfft(x * win, axis=-1, workers=-1)
+    psd = X.real**2
+    psd += X.imag**2
+    psd /= n*fs
+    freqs = rfftfreq(n, d=1.0/fs)
     return freqs, psd
 
 bands = {
@@ -103,31 +147,50 @@ bands = {
     'smr': (12,15)
 }
 
+def compute_band_powers(freqs, psd, bands):
+    """Sum psd over each [f0, f1) band in one np.add.reduceat pass.
+
+    Bands may overlap (smr sits inside beta), so the spectrum is reduced over
+    the sorted unique band edges and each band is assembled from those segments.
+    Returns an array shaped psd.shape[:-1] + (len(bands),).
+    """
+    edges = np.unique([f for fr in bands.values() for f in fr])
+    idx = np.searchsorted(freqs, edges)
+    # pad with a zero bin so edges past Nyquist still index a valid column
+    padded = np.concatenate([psd, np.zeros(psd.shape[:-1] + (1,))], axis=-1)
+    seg = np.add.reduceat(padded, idx, axis=-1)[..., :-1]
+    # reduceat returns the start element for empty segments; zero them out
+    seg *= np.diff(idx) > 0
+    cum = np.concatenate([np.zeros(seg.shape[:-1] + (1,)), np.cumsum(seg, axis=-1)], axis=-1)
+    lo = np.searchsorted(edges, [f0 for f0, _ in bands.values()])
+    hi = np.searchsorted(edges, [f1 for _, f1 in bands.values()])
+    return cum[..., hi] - cum[..., lo]
+
+# remove per-channel mean, then transform the stacked (channels, N) array
+freqs, psd_all = compute_psd(data - np.nanmean(data, axis=1, keepdims=True), fs_actual)
+band_all = compute_band_powers(freqs, psd_all, bands)
+
 results = {}
 for i,o in enumerate(offsets):
-    x = data[i]
-    # remove mean
-    x = x - np.nanmean(x)
-    freqs, psd = compute_psd(x, fs_actual)
+    psd = psd_all[i]
     total_power = psd.sum()
-    band_powers = {}
-    for name,(f0,f1) in bands.items():
-        mask = (freqs >= f0) & (freqs < f1)
-        p = psd[mask].sum()
-        band_powers[name] = float(p)
+    band_powers = {name: float(p) for name, p in zip(bands, band_all[i])}
     # normalize
     band_pows_pct = {k:(v/(total_power+1e-12))*100.0 for k,v in band_powers.items()}
     results[o] = {'mean': float(np.mean(data[i])), 'std': float(np.std(data[i])), 'band_power': band_powers, 'band_pct': band_pows_pct}
 
-    # save PSD plot per channel
-    plt.figure(figsize=(8,4))
-    plt.semilogy(freqs, psd)
-    plt.title(f'PSD off_{o}')
-    plt.xlabel('Hz'); plt.ylabel('PSD')
-    plt.xlim(0, fs_actual/2)
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTDIR, f'psd_off_{o}.png'))
+# save all channel PSDs as rows of a single figure
+fig, axes = plt.subplots(len(offsets), 1, figsize=(8, 4*len(offsets)), squeeze=False, constrained_layout=True)
+for ax, o, psd in zip(axes[:, 0], offsets, psd_all):
+    ax.semilogy(freqs, psd)
+    ax.set_title(f'PSD off_{o}')
+    ax.set_xlabel('Hz'); ax.set_ylabel('PSD')
+    ax.set_xlim(0, fs_actual/2)
+    ax.grid(True)
+png_psd = os.path.join(OUTDIR, 'psd_all.png')
+fig.savefig(png_psd, dpi=100)
+plt.close(fig)
+print('Wrote', png_psd)
 
 print('\nBand power results (absolute and % of total)')
 for o in offsets:
@@ -3,6 +3,8 @@ Bruteforce common start commands to activate EEG streaming
 """
 
 import asyncio
+import bisect
+import time
 from bleak import BleakClient
 
 # Common start/stop commands used by EEG devices
@@ -34,6 +36,10 @@ COMMON_COMMANDS = [
     (b'\x02\x00\x00\x00', "0x02 (4 bytes)"),
 ]
 
+# Gap between pipelined writes; packets arriving in this window are
+# attributed to the command just sent
+COMMAND_WINDOW = 0.3
+
 async def test_commands(address):
     """Try various commands to activate streaming"""
     
@@ -43,67 +49,74 @@ async def test_commands(address):
     async with BleakClient(address, timeout=20.0) as client:
         print(f"✓ Connected to {address}\n")
         
+        packets = []  # (arrival time, data)
+        
+        def handler(sender, data):
+            packets.append((time.monotonic(), data))
+            if len(packets) <= 5:
+                print(f"  ✓ Packet {len(packets)}: {len(data)} bytes - {data.hex()[:80]}")
+        
+        # Subscribe once, then send every command back-to-back
+        await client.start_notify(notify_char, handler)
+        
+        sent = []  # (send time, cmd, desc)
         for cmd, desc in COMMON_COMMANDS:
-            print(f"{'='*70}")
-            print(f"Testing: {desc}")
-            print(f"Command: {cmd.hex()}")
-            print(f"{'='*70}")
-            
-            received = [0]
-            packets = []
-            
-            def handler(sender, data):
-                received[0] += 1
-                packets.append(data)
-                if received[0] <= 5:
-                    print(f"  ✓ Packet {received[0]}: {len(data)} bytes - {data.hex()[:80]}")
-            
+            print(f"Sending {desc:<20} {cmd.hex()}")
             try:
-                # Subscribe to notifications
-                await client.start_notify(notify_char, handler)
-                
-                # Send the command
-                print(f"\nSending command...")
+                t_send = time.monotonic()
                 await client.write_gatt_char(write_char, cmd, response=False)
-                
-                # Wait for data
-                print(f"Waiting 2 seconds for response...")
-                await asyncio.sleep(2)
-                
-                # Stop notifications
-                await client.stop_notify(notify_char)
-                
-                if received[0] > 0:
-                    print(f"\n✓✓✓ SUCCESS! Received {received[0]} packets ✓✓✓")
-                    print(f"\nWorking command:")
-                    print(f"  Hex: {cmd.hex()}")
-                    print(f"  Description: {desc}")
-                    print(f"\nFirst packet preview:")
-                    if packets:
-                        print(f"  {packets[0].hex()}")
-                    
-                    # Try to decode first packet
-                    try:
-                        from process import decode_serenibrain_packet
-                        decoded = decode_serenibrain_packet(packets[0])
-                        print(f"\n  Decoded: Type 0x{decoded['packet_type']:02X}, "
-                              f"{len(decoded.get('samples', []))} samples")
-                    except Exception as e:
-                        print(f"  Decode attempt: {e}")
-                    
-                    print("\n" + "="*70)
-                    
-                    # Ask if we should continue testing
-                    print("\n✓ FOUND WORKING COMMAND!")
-                    return cmd
-                else:
-                    print(f"  No data received")
-                
-                # Small delay between tests
-                await asyncio.sleep(0.5)
-                
+                sent.append((t_send, cmd, desc))
             except Exception as e:
                 print(f"  Error: {e}")
+            await asyncio.sleep(COMMAND_WINDOW)
+        
+        # Give the last command time to take effect
+        print(f"Waiting 2 seconds for late responses...")
+        await asyncio.sleep(2)
+        await client.stop_notify(notify_char)
+        
+        # Attribute each packet to the most recent command sent before it
+        send_times = [t for t, _, _ in sent]
+        responses = {i: [] for i in range(len(sent))}
+        for t_arrival, data in packets:
+            i = bisect.bisect_right(send_times, t_arrival) - 1
+            if i >= 0:
+                responses[i].append(data)
+        
+        print(f"\n{'='*70}")
+        print(f"Received {len(packets)} packets in total")
+        print(f"{'='*70}")
+        for i, (_, cmd, desc) in enumerate(sent):
+            print(f"  {desc:<20} {cmd.hex():<16} {len(responses[i])} packets")
+        
+        for i, (_, cmd, desc) in enumerate(sent):
+            if not responses[i]:
+                continue
+            
+            print(f"\n✓✓✓ SUCCESS! Received {len(responses[i])} packets ✓✓✓")
+            print(f"\nWorking command:")
+            print(f"  Hex: {cmd.hex()}")
+            print(f"  Description: {desc}")
+            if i > 0:
+                print(f"  (device state may depend on the earlier commands in the sequence)")
+            print(f"\nFirst packet preview:")
+            print(f"  {responses[i][0].hex()}")
+            
+            # Try to decode first packet
+            from process import decode_serenibrain_packet, quick_is_serenibrain
+            if not quick_is_serenibrain(responses[i][0]):
+                print(f"  Decode attempt: no DATA header")
+            else:
+                try:
+                    decoded = decode_serenibrain_packet(responses[i][0])
+                    print(f"\n  Decoded: Type 0x{decoded['packet_type']:02X}, "
+                          f"{decoded['num_samples']} samples")
+                except Exception as e:
+                    print(f"  Decode attempt: {e}")
+            
+            print("\n" + "="*70)
+            print("\n✓ FOUND WORKING COMMAND!")
+            return cmd
         
         print(f"\n{'='*70}")
         print("No working command found in common set")
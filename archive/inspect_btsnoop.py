@@ -2,117 +2,195 @@
 Raw btsnoop packet inspector - shows all packet details
 """
 
+import binascii
+import mmap
 import struct
 import sys
 
-def inspect_btsnoop(filename, max_packets=200):
+import numpy as np
+
+RECORD_HEADER = struct.Struct('>IIIIQ')
+INCL_LEN = struct.Struct('>4xI')
+
+# Record header fields as stored on disk (big-endian); the index adds record
+# number and payload offset
+RECORD_DTYPE = np.dtype([('orig', '>u4'), ('incl', '>u4'), ('flags', '>u4'),
+                         ('drops', '>u4'), ('ts', '>u8')])
+INDEX_DTYPE = np.dtype([('num', 'u4'), ('off', 'u8'), ('orig', 'u4'), ('incl', 'u4'),
+                        ('flags', 'u4'), ('drops', 'u4'), ('ts', 'u8')])
+
+# 256-entry table mapping non-printable bytes to '.' for the hexdump ASCII column
+ASCII_TABLE = bytes.maketrans(
+    bytes(range(256)),
+    bytes(b if 32 <= b < 127 else ord('.') for b in range(256)),
+)
+HEX_SEP = b' '
+
+def _byte_table(names):
+    """256-entry tuple indexed directly by a byte value."""
+    return tuple(names.get(b, f"Unknown (0x{b:02X})") for b in range(256))
+
+HCI_TYPE_NAMES = _byte_table({
+    0x01: "HCI Command",
+    0x02: "HCI ACL Data",
+    0x03: "HCI SCO Data",
+    0x04: "HCI Event",
+    0x05: "HCI ISO Data"
+})
+
+ATT_OPCODE_NAMES = _byte_table({
+    0x01: "Error Response",
+    0x02: "Exchange MTU Request",
+    0x03: "Exchange MTU Response",
+    0x12: "Write Request",
+    0x13: "Write Response",
+    0x52: "Write Command",
+    0x1B: "Handle Value Notification",
+    0x1D: "Handle Value Indication"
+})
+
+
+def index_btsnoop(mv):
+    """Index every complete record in one pass.
+
+    Only incl_len is read per record to find the next one; the remaining
+    header fields are then decoded for all records at once with NumPy.
+    Returns a structured array (INDEX_DTYPE) whose 'num' is the 1-based record
+    number and 'off' the payload offset.
+    """
+    size = len(mv)
+    cursor = 16
+    headers = []
+    while cursor + RECORD_HEADER.size <= size:
+        incl_len = INCL_LEN.unpack_from(mv, cursor)[0]
+        if cursor + RECORD_HEADER.size + incl_len > size:
+            break
+        headers.append(cursor)
+        cursor += RECORD_HEADER.size + incl_len
+    
+    raw = np.frombuffer(mv, dtype=np.uint8)
+    header_offs = np.array(headers, dtype=np.int64)
+    fields = raw[header_offs[:, None] + np.arange(RECORD_HEADER.size)].view(RECORD_DTYPE).ravel()
+    
+    index = np.empty(len(headers), dtype=INDEX_DTYPE)
+    index['num'] = np.arange(1, len(headers) + 1)
+    index['off'] = header_offs + RECORD_HEADER.size
+    for name in RECORD_DTYPE.names:
+        index[name] = fields[name]
+    return index
+
+
+def att_mask(mv, index):
+    """Vectorized test for ACL packets carrying ATT (L2CAP CID 0x0004)."""
+    raw = np.frombuffer(mv, dtype=np.uint8)
+    mask = index['incl'] > 9
+    offs = index['off'][mask].astype(np.int64)
+    cid = raw[offs + 7].astype(np.uint16) | (raw[offs + 8].astype(np.uint16) << 8)
+    mask[mask] = (raw[offs] == 0x02) & (cid == 0x0004)
+    return mask
+
+
+def inspect_btsnoop(filename, max_packets=200, att_only=False):
     """Show raw packet structure for debugging."""
     
-    with open(filename, 'rb') as f:
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
         # Read header
-        header = f.read(16)
+        header = mm[:16]
         print(f"Header: {header.hex()}")
         print(f"  Magic: {header[:8]}")
         print(f"  Version: {struct.unpack('>I', header[8:12])[0]}")
         print(f"  Datalink: {struct.unpack('>I', header[12:16])[0]}")
         print()
         
-        packet_num = 0
+        with memoryview(mm) as mv:
+            index = index_btsnoop(mv)
+            if att_only:
+                index = index[att_mask(mv, index)]
+            packet_num = _inspect_records(mv, index[:max_packets])
         
-        while packet_num < max_packets:
-            # Read record header
-            record_header = f.read(24)
-            if len(record_header) < 24:
-                break
-            
-            orig_len, incl_len, flags, drops, timestamp = struct.unpack('>IIIIQ', record_header)
-            
-            # Read packet data
-            packet_data = f.read(incl_len)
-            if len(packet_data) < incl_len:
-                break
-            
-            packet_num += 1
-            
-            # Show packet details
-            print(f"{'='*70}")
-            print(f"Packet #{packet_num}")
-            print(f"{'='*70}")
-            print(f"  Original Length: {orig_len}")
-            print(f"  Included Length: {incl_len}")
-            print(f"  Flags: 0x{flags:08X}")
-            print(f"  Drops: {drops}")
-            print(f"  Timestamp: {timestamp} ({timestamp/1000000:.3f}s)")
-            print(f"\n  Raw Data ({len(packet_data)} bytes):")
-            
-            # Hexdump
-            for i in range(0, min(len(packet_data), 128), 16):
-                hex_str = ' '.join(f'{b:02X}' for b in packet_data[i:i+16])
-                ascii_str = ''.join(chr(b) if 32 <= b < 127 else '.' for b in packet_data[i:i+16])
-                print(f"    {i:04X}: {hex_str:48s} | {ascii_str}")
+        print(f"\nTotal packets inspected: {packet_num}")
+
+
+def _inspect_records(mv, index):
+    """Print each indexed record; returns the number shown."""
+    packet_num = 0
+    
+    for rec in index:
+        off = int(rec['off'])
+        orig_len, incl_len = int(rec['orig']), int(rec['incl'])
+        flags, drops, timestamp = int(rec['flags']), int(rec['drops']), int(rec['ts'])
+        
+        # Slice packet data without copying
+        packet_data = mv[off:off + incl_len]
+        
+        packet_num += 1
+        
+        # Show packet details
+        print(f"{'='*70}")
+        print(f"Packet #{rec['num']}")
+        print(f"{'='*70}")
+        print(f"  Original Length: {orig_len}")
+        print(f"  Included Length: {incl_len}")
+        print(f"  Flags: 0x{flags:08X}")
+        print(f"  Drops: {drops}")
+        print(f"  Timestamp: {timestamp} ({timestamp/1000000:.3f}s)")
+        print(f"\n  Raw Data ({len(packet_data)} bytes):")
+        
+        # Hexdump
+        for i in range(0, min(len(packet_data), 128), 16):
+            chunk = packet_data[i:i+16].tobytes()
+            hex_str = binascii.hexlify(chunk, HEX_SEP).decode('ascii').upper().ljust(48)
+            ascii_str = chunk.translate(ASCII_TABLE).decode('ascii')
+            print(f"    {i:04X}: {hex_str} | {ascii_str}")
+        
+        if len(packet_data) > 128:
+            print(f"    ... ({len(packet_data) - 128} more bytes)")
+        
+        # Try to identify packet type
+        if len(packet_data) > 0:
+            first_byte = packet_data[0]
+            packet_type = HCI_TYPE_NAMES[first_byte]
             
-            if len(packet_data) > 128:
-                print(f"    ... ({len(packet_data) - 128} more bytes)")
+            print(f"\n  Type: {packet_type}")
             
-            # Try to identify packet type
-            if len(packet_data) > 0:
-                first_byte = packet_data[0]
-                packet_type = {
-                    0x01: "HCI Command",
-                    0x02: "HCI ACL Data",
-                    0x03: "HCI SCO Data",
-                    0x04: "HCI Event",
-                    0x05: "HCI ISO Data"
-                }.get(first_byte, f"Unknown (0x{first_byte:02X})")
+            # If ACL data, try to parse
+            if first_byte == 0x02 and len(packet_data) >= 9:
+                handle_flags = struct.unpack('<H', packet_data[1:3])[0]
+                handle = handle_flags & 0x0FFF
+                pb_flag = (handle_flags >> 12) & 0x3
+                bc_flag = (handle_flags >> 14) & 0x3
+                data_len = struct.unpack('<H', packet_data[3:5])[0]
                 
-                print(f"\n  Type: {packet_type}")
+                print(f"  ACL: Handle=0x{handle:03X}, PB={pb_flag}, BC={bc_flag}, Len={data_len}")
                 
-                # If ACL data, try to parse
-                if first_byte == 0x02 and len(packet_data) >= 9:
-                    handle_flags = struct.unpack('<H', packet_data[1:3])[0]
-                    handle = handle_flags & 0x0FFF
-                    pb_flag = (handle_flags >> 12) & 0x3
-                    bc_flag = (handle_flags >> 14) & 0x3
-                    data_len = struct.unpack('<H', packet_data[3:5])[0]
+                # L2CAP header
+                if len(packet_data) >= 9:
+                    l2cap_len = struct.unpack('<H', packet_data[5:7])[0]
+                    l2cap_cid = struct.unpack('<H', packet_data[7:9])[0]
+                    print(f"  L2CAP: Length={l2cap_len}, CID=0x{l2cap_cid:04X}")
                     
-                    print(f"  ACL: Handle=0x{handle:03X}, PB={pb_flag}, BC={bc_flag}, Len={data_len}")
-                    
-                    # L2CAP header
-                    if len(packet_data) >= 9:
-                        l2cap_len = struct.unpack('<H', packet_data[5:7])[0]
-                        l2cap_cid = struct.unpack('<H', packet_data[7:9])[0]
-                        print(f"  L2CAP: Length={l2cap_len}, CID=0x{l2cap_cid:04X}")
+                    # ATT protocol (CID 0x0004)
+                    if l2cap_cid == 0x0004 and len(packet_data) > 9:
+                        att_opcode = packet_data[9]
+                        opcode_name = ATT_OPCODE_NAMES[att_opcode]
+                        print(f"  ATT: Opcode={opcode_name}")
                         
-                        # ATT protocol (CID 0x0004)
-                        if l2cap_cid == 0x0004 and len(packet_data) > 9:
-                            att_opcode = packet_data[9]
-                            att_opcodes = {
-                                0x01: "Error Response",
-                                0x02: "Exchange MTU Request",
-                                0x03: "Exchange MTU Response",
-                                0x12: "Write Request",
-                                0x13: "Write Response",
-                                0x52: "Write Command",
-                                0x1B: "Handle Value Notification",
-                                0x1D: "Handle Value Indication"
-                            }
-                            opcode_name = att_opcodes.get(att_opcode, f"Unknown (0x{att_opcode:02X})")
-                            print(f"  ATT: Opcode={opcode_name}")
-                            
-                            # If write or notification, show handle
-                            if att_opcode in [0x12, 0x52, 0x1B, 0x1D] and len(packet_data) >= 12:
-                                att_handle = struct.unpack('<H', packet_data[10:12])[0]
-                                att_value = packet_data[12:]
-                                print(f"  ATT: Handle=0x{att_handle:04X}")
-                                print(f"  ATT: Value=({len(att_value)} bytes) {att_value[:32].hex()}")
-            
-            print()
+                        # If write or notification, show handle
+                        if att_opcode in [0x12, 0x52, 0x1B, 0x1D] and len(packet_data) >= 12:
+                            att_handle = struct.unpack('<H', packet_data[10:12])[0]
+                            att_value = packet_data[12:]
+                            print(f"  ATT: Handle=0x{att_handle:04X}")
+                            print(f"  ATT: Value=({len(att_value)} bytes) {att_value[:32].hex()}")
         
-        print(f"\nTotal packets inspected: {packet_num}")
+        print()
+    
+    return packet_num
+
 
 
 if __name__ == "__main__":
     filename = sys.argv[1] if len(sys.argv) > 1 else 'btsnoop_hci.log'
     max_packets = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    att_only = '--att' in sys.argv[3:]
     
-    inspect_btsnoop(filename, max_packets)
+    inspect_btsnoop(filename, max_packets, att_only)
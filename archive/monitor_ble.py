@@ -28,26 +28,49 @@ async def monitor_device(address, duration=60):
         print(f"  5. Watch below for packets\n")
         print(f"{'='*70}\n")
         
-        packet_count = [0]
+        packet_count = 0
+        dropped = 0
         start_time = time.time()
         
+        # The BLE callback only enqueues; decoding and printing happen in
+        # drain() so a slow console never stalls packet reception
+        queue = asyncio.Queue(maxsize=1024)
+        
         def handler(sender, data):
-            packet_count[0] += 1
-            elapsed = time.time() - start_time
-            
-            print(f"[{elapsed:6.2f}s] Packet {packet_count[0]:4d}: {len(data):3d} bytes")
-            print(f"         Hex: {data.hex()}")
-            
-            # Try to decode
+            nonlocal packet_count, dropped
+            packet_count += 1
+            item = (packet_count, time.time() - start_time, data)
             try:
-                from process import decode_serenibrain_packet
-                decoded = decode_serenibrain_packet(data)
-                print(f"         Type: 0x{decoded['packet_type']:02X}, "
-                      f"Samples: {len(decoded.get('samples', []))}")
-            except:
-                pass
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Drop the oldest packet rather than block the callback
+                queue.get_nowait()
+                queue.task_done()
+                dropped += 1
+                queue.put_nowait(item)
+        
+        async def drain():
+            from process import decode_serenibrain_packet, quick_is_serenibrain
             
-            print()
+            while True:
+                num, elapsed, data = await queue.get()
+                
+                print(f"[{elapsed:6.2f}s] Packet {num:4d}: {len(data):3d} bytes")
+                print(f"         Hex: {data.hex()}")
+                
+                # Try to decode
+                if quick_is_serenibrain(data):
+                    try:
+                        decoded = decode_serenibrain_packet(data)
+                        print(f"         Type: 0x{decoded['packet_type']:02X}, "
+                              f"Samples: {decoded['num_samples']}")
+                    except:
+                        pass
+                
+                print()
+                queue.task_done()
+        
+        consumer = asyncio.create_task(drain())
         
         # Subscribe to notifications
         await client.start_notify(notify_char, handler)
@@ -62,13 +85,18 @@ async def monitor_device(address, duration=60):
         
         await client.stop_notify(notify_char)
         
+        # Let the consumer print whatever is still queued
+        await queue.join()
+        consumer.cancel()
+        
         print(f"\n{'='*70}")
         print(f"SUMMARY")
         print(f"{'='*70}")
-        print(f"Total packets received: {packet_count[0]}")
+        print(f"Total packets received: {packet_count}")
+        print(f"Dropped (queue full): {dropped}")
         print(f"Duration: {time.time() - start_time:.1f}s")
         
-        if packet_count[0] > 0:
+        if packet_count > 0:
             print(f"\n✓ Device is streaming!")
             print(f"The device appears to stream automatically when connected.")
         else:
@@ -8,12 +8,104 @@ The app exports 3 sections:
 3. Session summary with statistics
 """
 
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
 import argparse
+import copy
+import io
+import multiprocessing
 import os
+import re
+
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; band_stats falls back to NumPy
+    njit = None
+    prange = range
+
+
+# Default resolution for saved plots; savefig cost grows with dpi squared
+PLOT_DPI = 100
+
+# Plot methods rendered by render_all, in output order
+PLOT_METHODS = ('plot_timeseries', 'plot_scores', 'plot_band_powers', 'plot_session_summary')
+
+# Columns of the numeric sections that hold integers (kept int64 for export)
+INTEGER_COLUMNS = ('Practice Timestamp (ms)', 'Real-time Score')
+
+# Per-band voltage columns, e.g. "Delta Brainwave Voltage(µV)" (not the raw signal)
+BAND_COLUMN_RE = re.compile(r'(?!Raw )\S+ Brainwave Voltage')
+
+
+def _band_stats_fused(mat):
+    """Mean, std, min and max of every column in a single pass (Welford)"""
+    n, n_bands = mat.shape
+    means = np.empty(n_bands)
+    stds = np.empty(n_bands)
+    mins = np.empty(n_bands)
+    maxs = np.empty(n_bands)
+    for j in prange(n_bands):
+        mean = 0.0
+        m2 = 0.0
+        lo = np.inf
+        hi = -np.inf
+        for i in range(n):
+            x = mat[i, j]
+            delta = x - mean
+            mean += delta / (i + 1)
+            m2 += delta * (x - mean)
+            # NaN (a blank cell) sticks, as with np.min/np.max
+            if x != x:
+                lo = hi = x
+            else:
+                if x < lo:
+                    lo = x
+                if x > hi:
+                    hi = x
+        means[j] = mean
+        stds[j] = np.sqrt(m2 / n)
+        mins[j] = lo
+        maxs[j] = hi
+    return means, stds, mins, maxs
+
+
+def _band_stats_numpy(mat):
+    return (mat.mean(axis=0, dtype=np.float64), mat.std(axis=0, dtype=np.float64),
+            mat.min(axis=0), mat.max(axis=0))
+
+
+if njit is not None:
+    band_stats = njit(parallel=True, cache=True)(_band_stats_fused)
+else:
+    band_stats = _band_stats_numpy
+
+
+def _pyplot():
+    """Import pyplot (Agg backend) on first use so --no-plots runs skip it"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _prepare_figure(fig, figsize):
+    """Clear and resize a shared figure, or create one if none is given"""
+    if fig is None:
+        return _pyplot().figure(figsize=figsize), True
+    fig.clear()
+    fig.set_size_inches(figsize)
+    return fig, False
+
+
+def _render_plot(export, method, output_dir, dpi):
+    """Run one plot method in a worker process and return what it printed"""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        getattr(export, method)(output_dir, dpi=dpi)
+    return out.getvalue()
 
 
 class SerenibrainExport:
@@ -23,173 +115,203 @@ class SerenibrainExport:
         """Load and parse the export file"""
         self.file_path = file_path
         self.raw_brainwaves = None
+        self.band_names = []
+        self.band_matrix = None  # (samples, bands) float32, C-contiguous
+        self.time = None
+        self.raw_voltage = None
         self.scores = None
+        self.score_time = None
+        self.score_values = None
         self.session_summary = None
         
         self._parse_file()
     
     def _parse_file(self):
         """Parse the multi-section export file"""
+        # One pass to find each section's header line and row count; pandas
+        # then reads the rows straight from the file, with no string copies
+        sections = []  # [header, line number of header, data rows]
         with open(self.file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split by double newlines (sections)
-        sections = content.strip().split('\n\n')
+            in_section = False
+            for line_no, line in enumerate(f):
+                if not line.strip():
+                    in_section = False
+                elif not in_section:
+                    sections.append([line, line_no, 0])
+                    in_section = True
+                else:
+                    sections[-1][2] += 1
         
         # Parse each section
-        for section in sections:
-            if not section.strip():
-                continue
-            
-            lines = section.strip().split('\n')
-            header = lines[0]
-            
+        for header, start, n_rows in sections:
             # Section 1: Raw Brainwaves
             if 'Raw Brainwaves Voltage' in header:
-                self._parse_brainwaves(lines)
+                self._parse_brainwaves(header, start, n_rows)
             
             # Section 2: Real-time Scores
             elif 'Real-time Score' in header:
-                self._parse_scores(lines)
+                self._parse_scores(header, start, n_rows)
             
             # Section 3: Session Summary
             elif 'Practice Name' in header:
-                self._parse_summary(lines)
+                self._parse_summary(start, n_rows)
+    
+    def _read_section(self, start, n_rows):
+        """Read one mixed-type tab-separated section given its header line and row count"""
+        import pandas as pd
+        return pd.read_csv(self.file_path, sep='\t', skiprows=start, nrows=n_rows,
+                           encoding='utf-8', engine='c')
+    
+    def _read_numeric_section(self, header, start, n_rows):
+        """Read an all-numeric section as its column names and a (rows, columns) float64 array;
+        blank cells become NaN, as pandas would read them"""
+        columns = header.rstrip('\r\n').split('\t')
+        values = np.genfromtxt(self.file_path, delimiter='\t', skip_header=start + 1, max_rows=n_rows,
+                               dtype=np.float64, comments=None, encoding='utf-8',
+                               filling_values=np.nan, ndmin=2)
+        return columns, values.reshape(-1, len(columns))
     
-    def _parse_brainwaves(self, lines):
+    @staticmethod
+    def _numeric_frame(columns, values):
+        """Wrap a numeric section in a DataFrame for summary and CSV export"""
+        import pandas as pd
+        frame = pd.DataFrame(values, columns=columns)
+        for col in INTEGER_COLUMNS:
+            # A column with blanks stays float64 (NaN), as pandas would leave it
+            if col in frame and not frame[col].isna().any():
+                frame[col] = frame[col].astype(np.int64)
+        return frame
+    
+    def _parse_brainwaves(self, header, start, n_rows):
         """Parse brainwave voltage data"""
-        from io import StringIO
-        data = '\n'.join(lines)
-        self.raw_brainwaves = pd.read_csv(StringIO(data), sep='\t')
+        columns, values = self._read_numeric_section(header, start, n_rows)
+        self.raw_brainwaves = self._numeric_frame(columns, values)
         
         # Convert timestamp to seconds
         self.raw_brainwaves['Time (s)'] = self.raw_brainwaves['Practice Timestamp (ms)'] / 1000.0
+        
+        # Pull every band column into one row-major (samples, bands) array up
+        # front so plotting and stats work on contiguous memory; use .T for
+        # per-band access
+        band_idx = [j for j, col in enumerate(columns) if BAND_COLUMN_RE.match(col)]
+        self.band_names = [columns[j].split(' ')[0] for j in band_idx]
+        self.band_matrix = np.ascontiguousarray(values[:, band_idx], dtype=np.float32)
+        self.time = (values[:, columns.index('Practice Timestamp (ms)')] * 1e-3).astype(np.float32)
+        self.raw_voltage = values[:, columns.index('Raw Brainwaves Voltage(µV)')].astype(np.float32)
     
-    def _parse_scores(self, lines):
+    def _parse_scores(self, header, start, n_rows):
         """Parse real-time score data"""
-        from io import StringIO
-        data = '\n'.join(lines)
-        self.scores = pd.read_csv(StringIO(data), sep='\t')
+        columns, values = self._read_numeric_section(header, start, n_rows)
+        self.scores = self._numeric_frame(columns, values)
         
         # Convert timestamp to seconds
         self.scores['Time (s)'] = self.scores['Practice Timestamp (ms)'] / 1000.0
+        
+        # Plotting reads these instead of pulling .values out of the DataFrame
+        self.score_time = (values[:, columns.index('Practice Timestamp (ms)')] / 1000.0).astype(np.float32)
+        self.score_values = values[:, columns.index('Real-time Score')].astype(np.float32)
     
-    def _parse_summary(self, lines):
+    def _parse_summary(self, start, n_rows):
         """Parse session summary"""
-        from io import StringIO
-        data = '\n'.join(lines)
-        self.session_summary = pd.read_csv(StringIO(data), sep='\t')
+        self.session_summary = self._read_section(start, n_rows)
     
     def get_band_columns(self):
-        """Get list of brainwave band columns"""
-        if self.raw_brainwaves is None:
-            return []
-        
-        bands = []
-        for col in self.raw_brainwaves.columns:
-            if 'Brainwave Voltage' in col and 'Raw' not in col:
-                # Extract band name (e.g., "Delta" from "Delta Brainwave Voltage(µV)")
-                band = col.split(' ')[0]
-                bands.append(band)
-        return bands
+        """Get list of brainwave band columns (cached by _parse_brainwaves)"""
+        return self.band_names
     
-    def plot_timeseries(self, output_dir='plots'):
+    def plot_timeseries(self, output_dir='plots', fig=None, dpi=PLOT_DPI):
         """Plot all brainwave timeseries"""
-        if self.raw_brainwaves is None:
+        if self.band_matrix is None:
             print("No brainwave data to plot")
             return
         
         os.makedirs(output_dir, exist_ok=True)
         
         # Get time and band data
-        time = self.raw_brainwaves['Time (s)'].values
-        bands = self.get_band_columns()
+        time = self.time
+        bands = self.band_names
         
         # Create subplot for each band + raw
-        fig, axes = plt.subplots(len(bands) + 1, 1, figsize=(14, 3*(len(bands)+1)), sharex=True)
+        fig, owned = _prepare_figure(fig, (14, 3*(len(bands)+1)))
+        axes = fig.subplots(len(bands) + 1, 1, sharex=True)
         
         # Plot raw signal
-        raw_voltage = self.raw_brainwaves['Raw Brainwaves Voltage(µV)'].values
-        axes[0].plot(time, raw_voltage, 'k-', linewidth=0.5)
+        axes[0].plot(time, self.raw_voltage, 'k-', linewidth=0.5)
         axes[0].set_ylabel('Raw (µV)', fontsize=10)
         axes[0].set_title('Raw EEG Signal', fontsize=12, fontweight='bold')
         axes[0].grid(True, alpha=0.3)
         
-        # Plot each frequency band
+        # Plot each frequency band from column views of the band matrix
         colors = ['purple', 'blue', 'green', 'orange', 'red', 'brown', 'pink']
-        for i, band in enumerate(bands):
-            col_name = f'{band} Brainwave Voltage(µV)'
-            if col_name in self.raw_brainwaves.columns:
-                data = self.raw_brainwaves[col_name].values
-                axes[i+1].plot(time, data, color=colors[i % len(colors)], linewidth=1)
-                axes[i+1].set_ylabel(f'{band} (µV)', fontsize=10)
-                axes[i+1].set_title(f'{band} Band', fontsize=12, fontweight='bold')
-                axes[i+1].grid(True, alpha=0.3)
-                axes[i+1].axhline(0, color='gray', linestyle='--', alpha=0.5)
+        band_colors = [colors[i % len(colors)] for i in range(len(bands))]
+        for i, (band, color) in enumerate(zip(bands, band_colors)):
+            ax = axes[i+1]
+            ax.plot(time, self.band_matrix[:, i], color=color, linewidth=1)
+            ax.set_ylabel(f'{band} (µV)', fontsize=10)
+            ax.set_title(f'{band} Band', fontsize=12, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+            ax.axhline(0, color='gray', linestyle='--', alpha=0.5)
         
         axes[-1].set_xlabel('Time (s)', fontsize=12)
-        plt.tight_layout()
+        fig.tight_layout()
         
         output_path = os.path.join(output_dir, 'app_export_brainwaves.png')
-        plt.savefig(output_path, dpi=150)
+        fig.savefig(output_path, dpi=dpi)
         print(f"Saved brainwave plot: {output_path}")
-        plt.close()
+        if owned:
+            _pyplot().close(fig)
     
-    def plot_scores(self, output_dir='plots'):
+    def plot_scores(self, output_dir='plots', fig=None, dpi=PLOT_DPI):
         """Plot real-time scores"""
-        if self.scores is None:
+        if self.score_values is None:
             print("No score data to plot")
             return
         
         os.makedirs(output_dir, exist_ok=True)
         
-        fig, ax = plt.subplots(figsize=(12, 4))
+        fig, owned = _prepare_figure(fig, (12, 4))
+        ax = fig.subplots()
         
-        time = self.scores['Time (s)'].values
-        score = self.scores['Real-time Score'].values
+        time = self.score_time
+        score = self.score_values
         
         ax.plot(time, score, 'b-', linewidth=2, marker='o', markersize=3)
         ax.set_xlabel('Time (s)', fontsize=12)
         ax.set_ylabel('Score', fontsize=12)
         ax.set_title('Real-time Meditation Score', fontsize=14, fontweight='bold')
         ax.grid(True, alpha=0.3)
-        ax.set_ylim([0, max(score) * 1.1])
+        ax.set_ylim([0, score.max() * 1.1])
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         output_path = os.path.join(output_dir, 'app_export_scores.png')
-        plt.savefig(output_path, dpi=150)
+        fig.savefig(output_path, dpi=dpi)
         print(f"Saved score plot: {output_path}")
-        plt.close()
+        if owned:
+            _pyplot().close(fig)
     
-    def plot_band_powers(self, output_dir='plots'):
+    def plot_band_powers(self, output_dir='plots', fig=None, dpi=PLOT_DPI):
         """Plot band power distribution over time"""
-        if self.raw_brainwaves is None:
+        if self.band_matrix is None:
             print("No brainwave data to plot")
             return
         
         os.makedirs(output_dir, exist_ok=True)
         
-        bands = self.get_band_columns()
-        time = self.raw_brainwaves['Time (s)'].values
+        time = self.time
         
         # Calculate absolute power for each band
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8))
+        fig, owned = _prepare_figure(fig, (14, 8))
+        ax1, ax2 = fig.subplots(2, 1)
         
         # Top: Stacked area plot of band powers
-        band_data = []
-        labels = []
+        labels = self.band_names
         colors = ['purple', 'blue', 'green', 'orange', 'red', 'brown', 'pink']
         
-        for band in bands:
-            col_name = f'{band} Brainwave Voltage(µV)'
-            if col_name in self.raw_brainwaves.columns:
-                # Use absolute value for power representation
-                data = np.abs(self.raw_brainwaves[col_name].values)
-                band_data.append(data)
-                labels.append(band)
-        
-        band_data = np.array(band_data)
+        # Use absolute value for power representation, written straight into
+        # a (bands, samples) block so each band row is contiguous for plotting
+        band_data = np.empty(self.band_matrix.shape[::-1], dtype=np.float32)
+        np.abs(self.band_matrix.T, out=band_data)
         ax1.stackplot(time, *band_data, labels=labels, colors=colors[:len(labels)], alpha=0.7)
         ax1.set_ylabel('Absolute Voltage (µV)', fontsize=12)
         ax1.set_title('Band Power Distribution (Stacked)', fontsize=14, fontweight='bold')
@@ -206,14 +328,15 @@ class SerenibrainExport:
         ax2.legend(loc='upper right', fontsize=10)
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         output_path = os.path.join(output_dir, 'app_export_band_powers.png')
-        plt.savefig(output_path, dpi=150)
+        fig.savefig(output_path, dpi=dpi)
         print(f"Saved band power plot: {output_path}")
-        plt.close()
+        if owned:
+            _pyplot().close(fig)
     
-    def plot_session_summary(self, output_dir='plots'):
+    def plot_session_summary(self, output_dir='plots', fig=None, dpi=PLOT_DPI):
         """Plot session summary statistics"""
         if self.session_summary is None:
             print("No session summary to plot")
@@ -223,22 +346,21 @@ class SerenibrainExport:
         
         row = self.session_summary.iloc[0]
         
-        fig = plt.figure(figsize=(14, 6))
+        fig, owned = _prepare_figure(fig, (14, 6))
         
         # Left: State proportions pie chart
-        ax1 = plt.subplot(1, 3, 1)
+        ax1 = fig.add_subplot(1, 3, 1)
         states = ['Calm', 'Relaxed', 'Active']
-        proportions = [
-            float(row['Calm State Proportion'].rstrip('%')),
-            float(row['Relaxed State Proportion'].rstrip('%')),
-            float(row['Active State Proportion'].rstrip('%'))
-        ]
+        proportions = np.fromiter((float(row[f'{state} State Proportion'].rstrip('%')) for state in states),
+                                  dtype=np.float64, count=len(states))
+        duration_s = float(row['Practice Duration (s)'])
+        state_seconds = (proportions / 100 * duration_s).astype(int)
         colors = ['blue', 'green', 'red']
         ax1.pie(proportions, labels=states, autopct='%1.1f%%', colors=colors, startangle=90)
         ax1.set_title('Mental State Distribution', fontsize=12, fontweight='bold')
         
         # Middle: Band proportion (if available)
-        ax2 = plt.subplot(1, 3, 2)
+        ax2 = fig.add_subplot(1, 3, 2)
         if 'Delta Brainwave Proportion' in row:
             # For now just show delta, could expand if more bands are in summary
             ax2.bar(['Delta'], [float(row['Delta Brainwave Proportion'].rstrip('%'))], color='purple')
@@ -247,7 +369,7 @@ class SerenibrainExport:
             ax2.set_ylim([0, 100])
         
         # Right: Summary stats as text
-        ax3 = plt.subplot(1, 3, 3)
+        ax3 = fig.add_subplot(1, 3, 3)
         ax3.axis('off')
         
         summary_text = f"""
@@ -263,19 +385,52 @@ Average Score: {row['Average Score']}
 Evaluation: {row['Practice Evaluation']}
 
 State Durations:
-  Calm: {int(proportions[0]/100 * row['Practice Duration (s)'])} s
-  Relaxed: {int(proportions[1]/100 * row['Practice Duration (s)'])} s
-  Active: {int(proportions[2]/100 * row['Practice Duration (s)'])} s
+  Calm: {state_seconds[0]} s
+  Relaxed: {state_seconds[1]} s
+  Active: {state_seconds[2]} s
 """
         ax3.text(0.1, 0.5, summary_text, fontsize=10, family='monospace', 
                 verticalalignment='center')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         output_path = os.path.join(output_dir, 'app_export_summary.png')
-        plt.savefig(output_path, dpi=150)
+        fig.savefig(output_path, dpi=dpi)
         print(f"Saved summary plot: {output_path}")
-        plt.close()
+        if owned:
+            _pyplot().close(fig)
+    
+    def _plot_copy(self):
+        """Shallow copy without the per-sample DataFrames, cheap to pickle"""
+        export = copy.copy(self)
+        export.raw_brainwaves = None
+        export.scores = None
+        return export
+    
+    def render_all(self, output_dir='plots', dpi=PLOT_DPI, workers=None):
+        """Render every plot, in parallel processes or on one reused figure"""
+        if workers is None:
+            workers = min(len(PLOT_METHODS), os.cpu_count() or 1)
+        if workers > 1:
+            # Plots are independent and CPU-bound; workers get only the
+            # NumPy arrays and print in order once all are done. Spawn, not
+            # fork: band_stats may have started numba's thread pool already
+            export = self._plot_copy()
+            n = len(PLOT_METHODS)
+            with ProcessPoolExecutor(max_workers=min(workers, n),
+                                     mp_context=multiprocessing.get_context('spawn')) as ex:
+                for text in ex.map(_render_plot, [export] * n, PLOT_METHODS,
+                                   [output_dir] * n, [dpi] * n):
+                    print(text, end='')
+            return
+        
+        plt = _pyplot()
+        fig = plt.figure()
+        try:
+            for method in PLOT_METHODS:
+                getattr(self, method)(output_dir, fig=fig, dpi=dpi)
+        finally:
+            plt.close(fig)
     
     def print_summary(self):
         """Print summary statistics"""
@@ -291,13 +446,11 @@ State Durations:
             
             # Stats for each band
             print(f"\n  Band Statistics (µV):")
-            for band in self.get_band_columns():
-                col = f'{band} Brainwave Voltage(µV)'
-                if col in self.raw_brainwaves.columns:
-                    data = self.raw_brainwaves[col].values
-                    print(f"    {band:8s}: mean={np.mean(data):8.2f}, "
-                          f"std={np.std(data):8.2f}, "
-                          f"range=[{np.min(data):8.2f}, {np.max(data):8.2f}]")
+            means, stds, mins, maxs = band_stats(self.band_matrix)
+            for band, mean, std, lo, hi in zip(self.band_names, means, stds, mins, maxs):
+                print(f"    {band:8s}: mean={mean:8.2f}, "
+                      f"std={std:8.2f}, "
+                      f"range=[{lo:8.2f}, {hi:8.2f}]")
         
         if self.scores is not None:
             print(f"\nScore Data:")
@@ -353,6 +506,11 @@ def main():
                        help='Export parsed data to CSV files')
     parser.add_argument('--no-plots', action='store_true',
                        help='Skip generating plots')
+    parser.add_argument('--dpi', type=int, default=PLOT_DPI,
+                       help=f'Resolution of saved plots (default: {PLOT_DPI})')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Processes used to render plots, 1 renders in-process '
+                            '(default: one per plot, up to the CPU count)')
     
     args = parser.parse_args()
     
@@ -366,10 +524,7 @@ def main():
     # Generate plots
     if not args.no_plots:
         print(f"\nGenerating plots to {args.output_dir}/")
-        export.plot_timeseries(args.output_dir)
-        export.plot_scores(args.output_dir)
-        export.plot_band_powers(args.output_dir)
-        export.plot_session_summary(args.output_dir)
+        export.render_all(args.output_dir, dpi=args.dpi, workers=args.jobs)
     
     # Export CSV if requested
     if args.export_csv:
@@ -3,44 +3,58 @@ Quick BLE device scanner - shows all nearby Bluetooth LE devices
 """
 
 import asyncio
+import re
 from bleak import BleakScanner
 
+TARGET_RE = re.compile(r'serenibrain|th21a|eeg|brain', re.IGNORECASE)
+ROW_FORMAT = '{:<30} {:<20} {!s:<6} {}'.format
+
 async def scan_devices(duration=5.0):
     print(f"Scanning for BLE devices ({duration}s)...\n")
-    
-    devices = await BleakScanner.discover(timeout=duration)
-    
-    if not devices:
-        print("No BLE devices found!")
-        print("\nTroubleshooting:")
-        print("  - Ensure Bluetooth is enabled on this PC")
-        print("  - Turn on the EEG headband")
-        print("  - Try scanning for longer (increase duration)")
-        return
-    
-    print(f"Found {len(devices)} device(s):\n")
-    print(f"{'Name':<30} {'Address':<20} {'RSSI':<6} {'Details'}")
+    print(ROW_FORMAT('Name', 'Address', 'RSSI', 'Details'))
     print("=" * 80)
     
-    serenibrain_found = False
+    # Report adverts as they arrive and stop as soon as a target shows up,
+    # instead of buffering the whole scan window before looking at anything
+    seen = set()
+    found = asyncio.Event()
     
-    for device in devices:
-        name = device.name or "(Unknown)"
-        address = device.address
-        rssi = device.rssi if hasattr(device, 'rssi') else "N/A"
+    def detection_callback(device, advertisement_data):
+        if device.address in seen:
+            return
+        seen.add(device.address)
+        
+        name = device.name or advertisement_data.local_name or "(Unknown)"
+        rssi = advertisement_data.rssi
         
         # Highlight potential EEG devices
-        is_target = any(keyword in name.lower() for keyword in ['serenibrain', 'th21a', 'eeg', 'brain'])
+        is_target = TARGET_RE.search(name) is not None
         marker = " <-- TARGET" if is_target else ""
         
         if is_target:
-            serenibrain_found = True
+            found.set()
         
-        print(f"{name:<30} {address:<20} {rssi!s:<6} {marker}")
+        print(ROW_FORMAT(name, device.address, rssi, marker))
+    
+    async with BleakScanner(detection_callback=detection_callback):
+        try:
+            await asyncio.wait_for(found.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
     
     print("\n" + "=" * 80)
     
-    if serenibrain_found:
+    if not seen:
+        print("No BLE devices found!")
+        print("\nTroubleshooting:")
+        print("  - Ensure Bluetooth is enabled on this PC")
+        print("  - Turn on the EEG headband")
+        print("  - Try scanning for longer (increase duration)")
+        return
+    
+    print(f"\nFound {len(seen)} device(s)")
+    
+    if found.is_set():
         print("\n✓ Serenibrain device detected!")
         print("\nTo connect:")
         print("  python live_eeg_stream.py")
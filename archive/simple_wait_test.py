@@ -3,6 +3,7 @@ Simple test - just connect and wait for data with extended timeout
 """
 
 import asyncio
+import binascii
 from bleak import BleakClient
 from process import decode_serenibrain_packet
 
@@ -12,17 +13,32 @@ async def wait_for_stream(address):
     async with BleakClient(address, timeout=30.0) as client:
         print(f"✓ Connected to {address}\n")
         
-        received = [0]
+        received = 0
+        
+        # The BLE callback only enqueues; decoding happens in drain() so the
+        # notification path never waits on the decoder or the console
+        queue = asyncio.Queue()
         
         def handler(sender, data):
-            received[0] += 1
-            print(f"\n[Packet {received[0]}] {len(data)} bytes: {data.hex()[:80]}")
-            
-            try:
-                decoded = decode_serenibrain_packet(data)
-                print(f"  Type: 0x{decoded['packet_type']:02X}, Samples: {len(decoded.get('samples', []))}")
-            except Exception as e:
-                print(f"  Decode error: {e}")
+            nonlocal received
+            received += 1
+            queue.put_nowait((received, data))
+        
+        async def drain():
+            while True:
+                num, data = await queue.get()
+                # Only hex-encode the part that gets printed
+                preview = binascii.hexlify(bytes(data[:40])).decode('ascii')
+                print(f"\n[Packet {num}] {len(data)} bytes: {preview}")
+                
+                try:
+                    decoded = decode_serenibrain_packet(data)
+                    print(f"  Type: 0x{decoded['packet_type']:02X}, Samples: {decoded['num_samples']}")
+                except Exception as e:
+                    print(f"  Decode error: {e}")
+                queue.task_done()
+        
+        consumer = asyncio.create_task(drain())
         
         print("Subscribing to notifications...")
         await client.start_notify(notify_char, handler)
@@ -38,15 +54,15 @@ async def wait_for_stream(address):
         
         for i in range(30):
             await asyncio.sleep(1)
-            if received[0] > 0 and i >= 5:
-                print(f"\n✓ Receiving data! Got {received[0]} packets")
+            if received > 0 and i >= 5:
+                print(f"\n✓ Receiving data! Got {received} packets")
                 break
             elif i % 5 == 0 and i > 0:
-                print(f"  {i}s elapsed, {received[0]} packets received...")
+                print(f"  {i}s elapsed, {received} packets received...")
         
         await client.stop_notify(notify_char)
         
-        if received[0] == 0:
+        if received == 0:
             print(f"\n⚠ No data after 30 seconds")
             print(f"\nTrying to send start command...")
             
@@ -68,13 +84,17 @@ async def wait_for_stream(address):
             
             await client.stop_notify(notify_char)
             
-            if received[0] > 0:
-                print(f"\n✓ Got {received[0]} packets after commands!")
+            if received > 0:
+                print(f"\n✓ Got {received} packets after commands!")
             else:
                 print(f"\nStill no data. Device may need:")
                 print(f"  - Specific activation from phone app")
                 print(f"  - Electrode contact detection")
                 print(f"  - Button press on device")
+        
+        # Let the consumer print whatever is still queued
+        await queue.join()
+        consumer.cancel()
 
 
 if __name__ == "__main__":
@@ -3,7 +3,9 @@ Comprehensive activation test - tries reads, writes, and various sequences.
 """
 
 import asyncio
+import bisect
 import sys
+import time
 from bleak import BleakClient
 
 DEVICE_ADDRESS = "F6:82:59:5D:CC:5D"
@@ -11,36 +13,34 @@ SERVICE_UUID = "8653000a-43e6-47b7-9cb0-5fc21d4ae340"
 NOTIFY_CHAR = "8653000b-43e6-47b7-9cb0-5fc21d4ae340"
 WRITE_CHAR = "8653000c-43e6-47b7-9cb0-5fc21d4ae340"
 
-packet_count = 0
+# Listening window for every ("wait",) step; sequences run back-to-back on
+# one subscription and the first packet's arrival time says which one
+# started the stream (later sequences can't be judged once data is flowing)
+STEP_WAIT = 0.3
+
+packets = []  # (arrival time, data)
 
 def notification_handler(sender, data):
-    global packet_count
-    packet_count += 1
-    hex_str = ' '.join(f'{b:02X}' for b in data[:30])
-    print(f"  ✓✓✓ PACKET {packet_count}! {hex_str}...")
+    packets.append((time.monotonic(), data))
+    hex_str = data[:30].hex(' ').upper()
+    print(f"  ✓✓✓ PACKET {len(packets)}! {hex_str}...")
 
 async def try_sequence(client, name, sequence):
-    """Try a sequence of operations and check if data flows."""
-    global packet_count
-    packet_count = 0
-    
+    """Run a sequence of operations without waiting for its outcome."""
     print(f"\n{'='*70}")
     print(f"Testing: {name}")
     print(f"{'='*70}")
     
-    # Set up notification handler first
-    await client.start_notify(NOTIFY_CHAR, notification_handler)
-    
     # Execute the sequence
     for step in sequence:
         action, *params = step
         
         if action == "write":
             char_uuid, data = params
-            hex_str = ' '.join(f'{b:02X}' for b in data)
+            hex_str = data.hex(' ').upper()
             print(f"  Writing to {char_uuid[-8:]}: {hex_str}")
             try:
-                await client.write_gatt_char(char_uuid, data, response=True)
+                await client.write_gatt_char(char_uuid, data, response=False)
             except Exception as e:
                 print(f"    ❌ Write failed: {e}")
         
@@ -49,30 +49,13 @@ async def try_sequence(client, name, sequence):
             print(f"  Reading from {char_uuid[-8:]}...")
             try:
                 value = await client.read_gatt_char(char_uuid)
-                hex_str = ' '.join(f'{b:02X}' for b in value)
+                hex_str = value.hex(' ').upper()
                 print(f"    Value: {hex_str}")
             except Exception as e:
                 print(f"    ❌ Read failed: {e}")
         
         elif action == "wait":
-            duration = params[0]
-            print(f"  Waiting {duration}s for data...")
-            for _ in range(duration):
-                await asyncio.sleep(1)
-                if packet_count > 0:
-                    print(f"    ✓✓✓ DATA FLOWING! ({packet_count} packets)")
-                    break
-    
-    # Final wait
-    print(f"  Final wait (5s)...")
-    await asyncio.sleep(5)
-    
-    await client.stop_notify(NOTIFY_CHAR)
-    
-    result = "✓ SUCCESS!" if packet_count > 0 else "❌ No data"
-    print(f"\nResult: {result} ({packet_count} packets)")
-    
-    return packet_count > 0
+            await asyncio.sleep(STEP_WAIT)
 
 async def main():
     print("Comprehensive Activation Test")
@@ -81,61 +64,61 @@ async def main():
     # Test sequences to try
     sequences = [
         ("No command (baseline)", [
-            ("wait", 5),
+            ("wait",),
         ]),
         
         ("Write 0x01", [
             ("write", WRITE_CHAR, bytearray([0x01])),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 0x02", [
             ("write", WRITE_CHAR, bytearray([0x02])),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 'DATA' + 0x01", [
             ("write", WRITE_CHAR, bytearray(b'DATA\x01')),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 'DATA' + 0x02", [
             ("write", WRITE_CHAR, bytearray(b'DATA\x02')),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 'START'", [
             ("write", WRITE_CHAR, bytearray(b'START')),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 4-byte: 0x01000000", [
             ("write", WRITE_CHAR, bytearray([0x01, 0x00, 0x00, 0x00])),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 4-byte: 0x02000000", [
             ("write", WRITE_CHAR, bytearray([0x02, 0x00, 0x00, 0x00])),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 2-byte: 0x0100", [
             ("write", WRITE_CHAR, bytearray([0x01, 0x00])),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Write 2-byte: 0x0001", [
             ("write", WRITE_CHAR, bytearray([0x00, 0x01])),
-            ("wait", 3),
+            ("wait",),
         ]),
         
         ("Multiple writes: 0x01, 0x02, 0x03", [
             ("write", WRITE_CHAR, bytearray([0x01])),
-            ("wait", 1),
+            ("wait",),
             ("write", WRITE_CHAR, bytearray([0x02])),
-            ("wait", 1),
+            ("wait",),
             ("write", WRITE_CHAR, bytearray([0x03])),
-            ("wait", 2),
+            ("wait",),
         ]),
     ]
     
@@ -145,13 +128,36 @@ async def main():
         async with BleakClient(DEVICE_ADDRESS, timeout=15.0) as client:
             print(f"✓ Connected!\n")
             
-            successful = []
+            # Subscribe once for every sequence
+            await client.start_notify(NOTIFY_CHAR, notification_handler)
             
+            started = []  # start time of each sequence
             for name, sequence in sequences:
-                success = await try_sequence(client, name, sequence)
-                if success:
+                started.append(time.monotonic())
+                await try_sequence(client, name, sequence)
+            
+            # One final wait covers late responses to the last sequence
+            print(f"\nFinal wait (5s)...")
+            await asyncio.sleep(5)
+            await client.stop_notify(NOTIFY_CHAR)
+            
+            # Credit only the sequence running when the first packet arrived;
+            # once the stream is up, every later sequence would look successful
+            first = bisect.bisect_right(started, packets[0][0]) - 1 if packets else None
+            
+            successful = []
+            for i, (name, _) in enumerate(sequences):
+                if first is None or i < first:
+                    result = "❌ No data"
+                elif i == first:
+                    result = f"✓ SUCCESS! ({len(packets)} packets from here on)"
                     successful.append(name)
-                await asyncio.sleep(1)  # Pause between tests
+                else:
+                    result = "- inconclusive (already streaming)"
+                print(f"  {name:<40} {result}")
+            if first:
+                print(f"\n  Note: with {STEP_WAIT}s waits, a device slow to start may have been "
+                      f"triggered by '{sequences[first - 1][0]}' instead")
             
             print("\n" + "=" * 70)
             print("SUMMARY")
@@ -8,6 +8,10 @@ from process import decode_serenibrain_packet, calculate_band_powers, print_deco
 packet1 = "44-41-54-41-00-01-00-03-20-00-00-00-54-48-32-31-41-00-00-00-00-00-00-01-00-00-00-01-00-00-00-0A-00-00-00-02-00-00-00-18-00-00-00-0C"
 packet2 = "44-41-54-41-00-02-00-03-50-00-00-00-D1-3E-FD-00-00-00-00-7C-3E-FD-00-00-01-00-B6-3E-FD-00-00-02-00-8C-3E-FD-00-00-03-00-7A-3E-FD-00-00-04-00-8B-3E-FD-00-00-05-00-BF-3E-FD-00-00-06-00-B6-3E-FD-00-00-07-00-7E-3E-FD-00-00-08-00-99-3E-FD-00-00-09-00-21-10-E0-71-C6-87-F6-41-00-00"
 
+# The decoder prefers raw bytes, as delivered by BLE notifications
+packet1 = bytes.fromhex(packet1.replace('-', ''))
+packet2 = bytes.fromhex(packet2.replace('-', ''))
+
 print("="*70)
 print("TESTING PACKET DECODER")
 print("="*70)
@@ -29,8 +33,8 @@ else:
     print("(This is normal - live streaming accumulates packets)")
 
 print("\n### Test 4: Updated calculate_band_powers with Welch ###")
-if decoded2['samples']:
-    ch0_samples = [s['voltage_uv'] for s in decoded2['samples'] if s['channel'] == 0]
+if decoded2['num_samples']:
+    ch0_samples = decoded2['samples']['voltage_uv'][decoded2['samples']['channel'] == 0]
     if len(ch0_samples) >= 10:
         try:
             # Test with Welch (250 Hz sampling rate - device spec)
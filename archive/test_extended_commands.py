@@ -10,25 +10,51 @@ DEVICE_ADDRESS = "F6:82:59:5D:CC:5D"
 NOTIFY_CHAR = "8653000b-43e6-47b7-9cb0-5fc21d4ae340"
 WRITE_CHAR = "8653000c-43e6-47b7-9cb0-5fc21d4ae340"
 
+# Commands written back-to-back per listen window in the pre-scan
+BATCH_SIZE = 4
+
+# Sent before every probe so each one starts from a non-streaming device
+CMD_STOP_STREAM = bytes([0x43, 0x54, 0x52, 0x4C, 0x00, 0x03, 0x00, 0x03])  # "CTRL" 00 03 00 03
+QUIET_TIMEOUT = 10  # seconds to wait for packets to stop after STOP
+
 packet_count = 0
 
 def notification_handler(sender, data):
     global packet_count
     packet_count += 1
-    hex_str = ' '.join(f'{b:02X}' for b in data[:40])
+    hex_str = data[:40].hex(' ').upper()
     print(f"  ✓✓✓ PACKET {packet_count}! Length: {len(data)}, Data: {hex_str}...")
 
-async def try_command(client, name, data, wait_time=3):
-    """Try a single command."""
+async def stop_streaming(client, write_char):
+    """Send STOP and wait for a full second with no packets.
+    
+    Without this, a stream started by one probe keeps running and every
+    later probe would look like a trigger.
+    """
+    try:
+        await client.write_gatt_char(write_char, CMD_STOP_STREAM, response=True)
+    except Exception as e:
+        print(f"  ❌ STOP write failed: {e}")
+    
+    for _ in range(QUIET_TIMEOUT):
+        before = packet_count
+        await asyncio.sleep(1)
+        if packet_count == before:
+            return
+    raise RuntimeError("device kept streaming after STOP - cannot isolate the trigger")
+
+async def try_command(client, write_char, name, data, wait_time=3):
+    """Try a single command (write_char is the resolved characteristic)."""
     global packet_count
+    await stop_streaming(client, write_char)
     packet_count = 0
     
     print(f"\n[{name}]")
-    hex_str = ' '.join(f'{b:02X}' for b in data)
+    hex_str = data.hex(' ').upper()
     print(f"  Writing: {hex_str}")
     
     try:
-        await client.write_gatt_char(WRITE_CHAR, data, response=True)
+        await client.write_gatt_char(write_char, data, response=True)
         print(f"  Waiting {wait_time}s...")
         
         for i in range(wait_time):
@@ -44,6 +70,41 @@ async def try_command(client, name, data, wait_time=3):
         print(f"  ❌ Write failed: {e}")
         return False
 
+async def probe_batch(client, write_char, batch, response=False, wait_time=3):
+    """Write a batch of commands back-to-back, then listen once for data."""
+    global packet_count
+    await stop_streaming(client, write_char)
+    packet_count = 0
+    
+    print(f"\n[{', '.join(name for name, _ in batch)}]")
+    for name, data in batch:
+        try:
+            await client.write_gatt_char(write_char, data, response=response)
+        except Exception as e:
+            print(f"  ❌ Write {name} failed: {e}")
+    
+    print(f"  Waiting {wait_time}s...")
+    for i in range(wait_time):
+        await asyncio.sleep(1)
+        if packet_count > 0:
+            print(f"  ✓✓✓ Data flowing! ({packet_count} packets in {i+1}s)")
+            return True
+    
+    print(f"  No data ({packet_count} packets)")
+    return False
+
+async def narrow_down(client, write_char, batch):
+    """Split a batch that produced data until the triggering commands are known."""
+    if len(batch) == 1:
+        return [batch[0]]
+    
+    mid = len(batch) // 2
+    found = []
+    for half in (batch[:mid], batch[mid:]):
+        if await probe_batch(client, write_char, half, response=True):
+            found += await narrow_down(client, write_char, half)
+    return found
+
 async def main():
     print("="*70)
     print("EXTENDED BLE ACTIVATION TEST")
@@ -109,18 +170,30 @@ async def main():
             await client.start_notify(NOTIFY_CHAR, notification_handler)
             print("✓ Notifications enabled\n")
             
+            # Resolve the write characteristic once rather than by UUID per write
+            write_char = client.services.get_characteristic(WRITE_CHAR)
+            
             successful = []
             
-            for name, data in commands:
-                success = await try_command(client, name, data, wait_time=3)
-                if success:
-                    successful.append(name)
-                    # If we find a working command, try it a few more times to confirm
-                    print(f"\n  ⚠ CONFIRMING: Trying {name} again...")
-                    await asyncio.sleep(2)
-                    await try_command(client, f"{name} (retry)", data, wait_time=5)
+            # Pre-scan: pipeline each batch with write-without-response and
+            # listen once; only batches that produced data get narrowed down.
+            # Every probe starts with STOP, and the sweep ends at the first
+            # confirmed trigger
+            for start in range(0, len(commands), BATCH_SIZE):
+                batch = commands[start:start + BATCH_SIZE]
+                if not await probe_batch(client, write_char, batch):
+                    continue
                 
-                await asyncio.sleep(0.5)  # Small delay between commands
+                for name, data in await narrow_down(client, write_char, batch):
+                    # If we find a working command, try it again to confirm
+                    print(f"\n  ⚠ CONFIRMING: Trying {name} again...")
+                    if await try_command(client, write_char, f"{name} (retry)", data, wait_time=5):
+                        successful.append(name)
+                        break
+                if successful:
+                    break
+            
+            await stop_streaming(client, write_char)
             
             await client.stop_notify(NOTIFY_CHAR)
             
@@ -15,25 +15,60 @@ Make sure:
 
 import asyncio
 import sys
+from array import array
 from bleak import BleakClient, BleakScanner
 
 DEVICE_ADDRESS = "F6:82:59:5D:CC:5D"
 NOTIFY_CHAR = "8653000b-43e6-47b7-9cb0-5fc21d4ae340"
 
-packet_count = 0
-start_time = None
+# Print every Nth packet (power of two) of the capture once it's over
+PRINT_EVERY = 64
 
-def notification_handler(sender, data):
-    global packet_count, start_time
-    if start_time is None:
-        start_time = asyncio.get_event_loop().time()
+# Payloads are copied into one buffer preallocated for the whole capture, so
+# the notification callback does no allocation or printing of its own
+CAPTURE_SECONDS = 60
+MAX_PACKETS = CAPTURE_SECONDS * 200
+MAX_PACKET_SIZE = 244  # largest notification payload at the maximum BLE MTU
+
+class Collector:
+    """Notification handler that copies packets into a preallocated buffer."""
+    
+    def __init__(self, loop):
+        self.loop = loop
+        self.t0 = None
+        self.n = 0
+        self.buf = bytearray(MAX_PACKETS * MAX_PACKET_SIZE)
+        self.used = 0
+        self.offsets = array('L')
+        self.sizes = array('H')
+        self.times = array('d')
+    
+    def __call__(self, sender, data):
+        now = self.loop.time()
+        if self.t0 is None:
+            self.t0 = now
+        
+        self.n += 1
+        end = self.used + len(data)
+        if end <= len(self.buf):
+            self.buf[self.used:end] = data
+            self.offsets.append(self.used)
+            self.sizes.append(len(data))
+            self.times.append(now - self.t0)
+            self.used = end
     
-    packet_count += 1
-    print(f"✓ Packet {packet_count} received! ({len(data)} bytes) - Time: {asyncio.get_event_loop().time() - start_time:.1f}s")
+    def packet(self, i):
+        start = self.offsets[i]
+        return memoryview(self.buf)[start:start + self.sizes[i]]
     
-    # Show first few bytes
-    hex_str = ' '.join(f'{b:02X}' for b in data[:20])
-    print(f"  Data: {hex_str}...")
+    def print_packets(self):
+        lines = []
+        for i in range(0, len(self.sizes), PRINT_EVERY):
+            lines.append(f"✓ Packet {i + 1} received! ({self.sizes[i]} bytes) - Time: {self.times[i]:.1f}s")
+            # Show first few bytes
+            lines.append(f"  Data: {self.packet(i)[:20].hex(' ').upper()}...")
+        if lines:
+            print("\n".join(lines))
 
 async def main():
     print("=" * 70)
@@ -53,28 +88,32 @@ async def main():
             print()
             
             # Subscribe
+            collector = Collector(asyncio.get_running_loop())
             print(f"Subscribing to notifications on {NOTIFY_CHAR}...")
-            await client.start_notify(NOTIFY_CHAR, notification_handler)
+            await client.start_notify(NOTIFY_CHAR, collector)
             print("✓ Subscribed!")
             print()
             
-            print("Waiting for data (60 seconds)...")
+            print(f"Waiting for data ({CAPTURE_SECONDS} seconds)...")
             print("If device requires electrode contact, make sure it's worn properly.")
             print()
             
-            # Wait 60 seconds
-            for i in range(60):
+            for i in range(CAPTURE_SECONDS):
                 await asyncio.sleep(1)
                 if i % 10 == 9:
-                    print(f"  [{i+1}s] Still waiting... (packets received: {packet_count})")
+                    print(f"  [{i+1}s] Still waiting... (packets received: {collector.n})")
+            
+            await client.stop_notify(NOTIFY_CHAR)
+            print()
+            collector.print_packets()
             
             print()
             print("=" * 70)
             print("RESULTS")
             print("=" * 70)
-            print(f"Total packets received: {packet_count}")
+            print(f"Total packets received: {collector.n}")
             
-            if packet_count == 0:
+            if collector.n == 0:
                 print()
                 print("❌ NO DATA RECEIVED")
                 print()
@@ -91,8 +130,11 @@ async def main():
             else:
                 print()
                 print("✓ SUCCESS! Device is streaming.")
-                avg_rate = packet_count / 60.0
+                avg_rate = collector.n / CAPTURE_SECONDS
                 print(f"  Average rate: {avg_rate:.1f} packets/second")
+                print(f"  Average size: {collector.used / len(collector.sizes):.1f} bytes/packet")
+                if len(collector.sizes) < collector.n:
+                    print(f"  (capture buffer full: kept the first {len(collector.sizes)} packets)")
     
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -100,7 +142,7 @@ async def main():
         traceback.print_exc()
         return 1
     
-    return 0 if packet_count > 0 else 1
+    return 0 if collector.n > 0 else 1
 
 if __name__ == "__main__":
     sys.exit(asyncio.run(main()))
@@ -6,19 +6,42 @@ Sometimes automatic notification enabling doesn't work - this forces the descrip
 
 import asyncio
 import sys
+from array import array
 from bleak import BleakClient
 
 DEVICE_ADDRESS = "F6:82:59:5D:CC:5D"
 NOTIFY_CHAR = "8653000b-43e6-47b7-9cb0-5fc21d4ae340"
 CCCD_UUID = "00002902-0000-1000-8000-00805f9b34fb"  # Standard CCCD UUID
 
+# Payloads are copied into one buffer preallocated for the whole capture and
+# only printed once it's over, so the notification callback stays cheap
+CAPTURE_SECONDS = 30
+MAX_PACKETS = CAPTURE_SECONDS * 200
+MAX_PACKET_SIZE = 244  # largest notification payload at the maximum BLE MTU
+
 packet_count = 0
+capture = bytearray(MAX_PACKETS * MAX_PACKET_SIZE)
+capture_used = 0
+packet_ends = array('L')
 
 def notification_handler(sender, data):
-    global packet_count
+    global packet_count, capture_used
     packet_count += 1
-    hex_str = ' '.join(f'{b:02X}' for b in data[:20])
-    print(f"✓ Packet {packet_count}: {hex_str}...")
+    end = capture_used + len(data)
+    if end <= len(capture):
+        capture[capture_used:end] = data
+        packet_ends.append(end)
+        capture_used = end
+
+def print_packets():
+    view = memoryview(capture)
+    start = 0
+    lines = []
+    for n, end in enumerate(packet_ends, 1):
+        lines.append(f"✓ Packet {n}: {view[start:min(end, start + 20)].hex(' ').upper()}...")
+        start = end
+    if lines:
+        print("\n".join(lines))
 
 async def main():
     print("Connecting...")
@@ -27,12 +50,7 @@ async def main():
         print(f"✓ Connected to {DEVICE_ADDRESS}")
         
         # Get the characteristic and its CCCD descriptor
-        char = None
-        for service in client.services:
-            for c in service.characteristics:
-                if c.uuid.lower() == NOTIFY_CHAR.lower():
-                    char = c
-                    break
+        char = client.services.get_characteristic(NOTIFY_CHAR)
         
         if not char:
             print("❌ Characteristic not found!")
@@ -43,11 +61,7 @@ async def main():
         print(f"Descriptors: {[d.uuid for d in char.descriptors]}")
         
         # Find CCCD descriptor
-        cccd = None
-        for desc in char.descriptors:
-            if desc.uuid.lower() == CCCD_UUID.lower():
-                cccd = desc
-                break
+        cccd = char.get_descriptor(CCCD_UUID)
         
         if cccd:
             print(f"\nFound CCCD descriptor: {cccd.uuid}")
@@ -61,19 +75,23 @@ async def main():
             except Exception as e:
                 print(f"❌ CCCD write failed: {e}")
             
-            # Set up notification handler
-            await client.start_notify(NOTIFY_CHAR, notification_handler)
+            # Set up notification handler on the already-resolved characteristic
+            await client.start_notify(char, notification_handler)
             print("✓ Notification handler registered")
         else:
             print("\n⚠ No CCCD descriptor found, using standard start_notify")
-            await client.start_notify(NOTIFY_CHAR, notification_handler)
+            await client.start_notify(char, notification_handler)
         
-        print("\nWaiting 30 seconds for data...")
-        for i in range(30):
+        print(f"\nWaiting {CAPTURE_SECONDS} seconds for data...")
+        for i in range(CAPTURE_SECONDS):
             await asyncio.sleep(1)
             if i % 5 == 4:
                 print(f"  [{i+1}s] Packets: {packet_count}")
         
+        await client.stop_notify(char)
+        print()
+        print_packets()
+        
         print(f"\n{'✓' if packet_count > 0 else '❌'} Total packets: {packet_count}")
         
         return 0 if packet_count > 0 else 1
@@ -1,7 +1,94 @@
 import json
+import sys
 import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401 - lets pandas use its multithreaded CSV reader
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the summary falls back to stdlib json
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; window_stats falls back to NumPy
+    njit = None
+    prange = range
+
+
+def _window_stats_fused(mat, bounds):
+    """NaN-skipping mean, std (ddof=1), max and count of every column over
+    each row range bounds[w]:bounds[w+1], in a single pass (Welford)"""
+    n_windows = len(bounds) - 1
+    n_cols = mat.shape[1]
+    means = np.full((n_windows, n_cols), np.nan)
+    stds = np.full((n_windows, n_cols), np.nan)
+    maxs = np.full((n_windows, n_cols), np.nan)
+    counts = np.zeros((n_windows, n_cols), dtype=np.int64)
+    for w in prange(n_windows):
+        mean = np.zeros(n_cols)
+        m2 = np.zeros(n_cols)
+        top = np.full(n_cols, -np.inf)
+        n = np.zeros(n_cols, dtype=np.int64)
+        for i in range(bounds[w], bounds[w + 1]):
+            for j in range(n_cols):
+                x = mat[i, j]
+                if x == x:  # skip NaN
+                    n[j] += 1
+                    delta = x - mean[j]
+                    mean[j] += delta / n[j]
+                    m2[j] += delta * (x - mean[j])
+                    top[j] = max(top[j], x)
+        for j in range(n_cols):
+            counts[w, j] = n[j]
+            if n[j] > 0:
+                means[w, j] = mean[j]
+                maxs[w, j] = top[j]
+            if n[j] > 1:
+                stds[w, j] = np.sqrt(m2[j] / (n[j] - 1))
+    return means, stds, maxs, counts
+
+
+def _window_stats_numpy(mat, bounds):
+    """Same statistics as _window_stats_fused, reduced over all windows at
+    once with ufunc.reduceat instead of a Python loop over windows"""
+    n_windows = len(bounds) - 1
+    means = np.full((n_windows, mat.shape[1]), np.nan)
+    stds = means.copy()
+    maxs = means.copy()
+    counts = np.zeros(means.shape, dtype=np.int64)
+    sizes = np.diff(bounds)
+    filled = sizes > 0
+    if not filled.any():
+        return means, stds, maxs, counts
+    # Windows are contiguous, so the starts of the non-empty ones split the
+    # rows they cover into exactly those windows
+    starts = bounds[:-1][filled]
+    rows = mat[starts[0]:bounds[-1]]
+    starts = starts - starts[0]
+    valid = ~np.isnan(rows)
+    n = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.add.reduceat(np.where(valid, rows, 0.0), starts, axis=0) / n
+        dev = np.where(valid, rows - np.repeat(mean, sizes[filled], axis=0), 0.0)
+        std = np.sqrt(np.add.reduceat(dev * dev, starts, axis=0) / (n - 1))
+    counts[filled] = n
+    means[filled] = mean
+    stds[filled] = np.where(n > 1, std, np.nan)
+    maxs[filled] = np.fmax.reduceat(rows, starts, axis=0)
+    return means, stds, maxs, counts
+
+
+if njit is not None:
+    window_stats = njit(parallel=True, cache=True)(_window_stats_fused)
+else:
+    window_stats = _window_stats_numpy
+
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
@@ -9,17 +96,34 @@ CSV_PATH = "C:\\Users\\kaden\\Downloads\\finalfinal.csv"  # replace with your CS
 WINDOW_SEC = 10             # period length for summarizing (seconds)
 FS_FALLBACK = 83.33         # fallback per-channel sampling rate in Hz
 
+# Every column either CSV type can carry that we use
+TIME_COLUMNS = ['Practice Timestamp (ms)', 'timestamp_ms', 'timestamp', 'Time (s)', 'Time_s']
+ALL_BANDS = ['Delta', 'Theta', 'Alpha', 'Beta', 'Gamma', 'SMR']
+VALUE_SUFFIXES = [' Power (µV²)', ' %', ' Brainwave Voltage(µV)']
+SCORE_COLUMNS = ['Relaxation Score', 'Focus Score']
+
 # -----------------------------
 # LOAD CSV
 # -----------------------------
-df = pd.read_csv(CSV_PATH)
+# Only parse the columns we use; peek at the header to see which are present
+VALUE_COLUMNS = [f"{band}{suffix}" for band in ALL_BANDS for suffix in VALUE_SUFFIXES] + SCORE_COLUMNS
+header = pd.read_csv(CSV_PATH, nrows=0).columns
+df = pd.read_csv(CSV_PATH, usecols=[col for col in header if col in TIME_COLUMNS + VALUE_COLUMNS],
+                 engine=CSV_ENGINE)
 
-# Normalise empty strings to NaN so we don't treat missing values as zeros
-df = df.replace(r'^\s*$', np.nan, regex=True)
+# Normalise empty strings to NaN so we don't treat missing values as zeros;
+# only text columns can hold them, numeric columns already parsed blanks as NaN
+text_cols = df.select_dtypes(exclude='number').columns
+if len(text_cols):
+    df[text_cols] = df[text_cols].replace(r'^\s*$', np.nan, regex=True)
+
+# Parse the value columns to numbers once rather than per period
+numeric_candidates = [col for col in VALUE_COLUMNS if col in df.columns]
+df[numeric_candidates] = df[numeric_candidates].apply(pd.to_numeric, errors='coerce')
 
 # Ensure we have a usable time axis in seconds
 time_col = None
-for candidate in ['Practice Timestamp (ms)', 'timestamp_ms', 'timestamp', 'Time (s)', 'Time_s']:
+for candidate in TIME_COLUMNS:
     if candidate in df.columns:
         time_col = candidate
         break
@@ -33,7 +137,9 @@ if 'ms' in time_col.lower():
 else:
     df['Time_s'] = time_series
 
-df = df.sort_values('Time_s').reset_index(drop=True)
+# Recordings are almost always written in time order; only sort when they aren't
+if not df['Time_s'].is_monotonic_increasing:
+    df = df.sort_values('Time_s').reset_index(drop=True)
 
 # Derive effective sampling rate from time deltas (ignoring zeros for sparse data)
 time_diffs = df['Time_s'].diff().dropna()
@@ -65,75 +171,121 @@ else:
 # -----------------------------
 # SPLIT INTO PERIODS (TIME-BASED SO SPARSE DATA WORKS)
 # -----------------------------
-total_duration = df['Time_s'].max() - df['Time_s'].min()
+t_start = df['Time_s'].min()
+total_duration = df['Time_s'].max() - t_start
 num_periods = int(np.ceil(total_duration / WINDOW_SEC)) if WINDOW_SEC > 0 else 0
 if num_periods == 0 and not df.empty:
     num_periods = 1
 
-summary = []
+# Period i covers [t_start + i*WINDOW_SEC, t_start + (i+1)*WINDOW_SEC). Rows
+# are sorted by time (missing timestamps last), so each period is the row
+# range bounds[i]:bounds[i+1], found by binary search instead of masks
+time_s = df['Time_s'].to_numpy()
+window_starts = t_start + np.arange(num_periods + 1) * WINDOW_SEC
+bounds = np.searchsorted(time_s, window_starts)
+sizes = np.diff(bounds)
+
+band_cols = {band: f"{band}{band_suffix}" for band in BANDS if f"{band}{band_suffix}" in df.columns}
+percent_cols = {}
+if is_powers_csv and percent_suffix:
+    percent_cols = {band: f"{band}{percent_suffix}" for band in BANDS if f"{band}{percent_suffix}" in df.columns}
+score_cols = {}
+if is_powers_csv:
+    score_cols = {name: col for name, col in [('Relaxation', 'Relaxation Score'), ('Focus', 'Focus Score')]
+                  if col in df.columns}
+value_cols = list(dict.fromkeys([*band_cols.values(), *percent_cols.values(), *score_cols.values()]))
 
-for i in range(num_periods):
-    window_start = df['Time_s'].min() + i * WINDOW_SEC
-    window_end = window_start + WINDOW_SEC
+# All per-period statistics in one fused pass over a single (rows, columns)
+# matrix instead of separate reductions per period and column. The matrix is
+# filled column by column so the frame is copied once, not via a sub-frame
+# plus a row-major copy of it. It stays float64: the fused pass is bound by
+# its per-sample arithmetic rather than memory, and float32 inputs would leak
+# representation noise (12.345 -> 12.345000267...) into the printed maxima
+value_matrix = np.empty((len(df), len(value_cols)))
+for j, col in enumerate(value_cols):
+    value_matrix[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+means, stds, maxs, counts = window_stats(value_matrix, bounds)
 
-    period_df = df[(df['Time_s'] >= window_start) & (df['Time_s'] < window_end)]
+# Pull each column's per-period results out as plain Python lists once, so
+# building the summary is list indexing rather than NumPy scalar lookups
+column_table = {
+    col: {'mean': means[:, j].tolist(), 'std': stds[:, j].tolist(),
+          'max': maxs[:, j].tolist(), 'count': counts[:, j].tolist()}
+    for j, col in enumerate(value_cols)
+}
 
-    if period_df.empty:
-        summary.append({
+
+def column_stats(col, i, names):
+    """Requested statistics of col in period i, or None for each if it has no values"""
+    table = column_table[col]
+    if not table['count'][i]:
+        return [None] * len(names)
+    values = [table[name][i] for name in names]
+    # NaN (std of a single sample) becomes None so the output stays valid JSON
+    return [None if value != value else value for value in values]
+
+
+# Column presence doesn't change between periods: lay out every statistic key
+# once, in output order, with None for bands this CSV doesn't carry. Each row
+# starts as a copy of the template and only the present columns are filled in
+stat_template = {}
+for band in BANDS:
+    stat_template.update(dict.fromkeys([f'{band}_mean', f'{band}_std', f'{band}_max']))
+if is_powers_csv and percent_suffix:
+    stat_template.update(dict.fromkeys(f'{band}_percent_mean' for band in BANDS))
+for name in score_cols:
+    stat_template.update(dict.fromkeys([f'{name}_mean', f'{name}_std']))
+
+
+def period_rows():
+    """Summary row of every period, built as it is written out"""
+    for i, size in enumerate(sizes):
+        if not size:
+            yield {
+                'Period': i,
+                'Start_s': float(window_starts[i]),
+                'End_s': float(window_starts[i] + WINDOW_SEC),
+                'Samples': 0
+            }
+            continue
+
+        row = {
             'Period': i,
-            'Start_s': float(window_start),
-            'End_s': float(window_end),
-            'Samples': 0
-        })
-        continue
-
-    stats = {
-        'Period': i,
-        'Start_s': float(period_df['Time_s'].iloc[0]),
-        'End_s': float(period_df['Time_s'].iloc[-1]),
-        'Samples': int(len(period_df))
-    }
-
-    # Process band data
-    for band in BANDS:
-        col = f"{band}{band_suffix}"
-        if col in period_df.columns:
-            vals = pd.to_numeric(period_df[col], errors='coerce')
-            if vals.dropna().empty:
-                stats[f'{band}_mean'] = None
-                stats[f'{band}_std'] = None
-                stats[f'{band}_max'] = None
-            else:
-                stats[f'{band}_mean'] = float(vals.mean(skipna=True))
-                stats[f'{band}_std'] = float(vals.std(skipna=True))
-                stats[f'{band}_max'] = float(vals.max(skipna=True))
-        else:
-            stats[f'{band}_mean'] = stats[f'{band}_std'] = stats[f'{band}_max'] = None
-    
-    # Add percentages if powers CSV
-    if is_powers_csv and percent_suffix:
-        for band in BANDS:
-            col = f"{band}{percent_suffix}"
-            if col in period_df.columns:
-                vals = pd.to_numeric(period_df[col], errors='coerce')
-                stats[f'{band}_percent_mean'] = float(vals.mean(skipna=True)) if not vals.dropna().empty else None
-            else:
-                stats[f'{band}_percent_mean'] = None
-    
-    # Add relaxation/focus scores if powers CSV
-    if is_powers_csv:
-        if 'Relaxation Score' in period_df.columns:
-            relax = pd.to_numeric(period_df['Relaxation Score'], errors='coerce')
-            stats['Relaxation_mean'] = float(relax.mean(skipna=True)) if not relax.dropna().empty else None
-            stats['Relaxation_std'] = float(relax.std(skipna=True)) if not relax.dropna().empty else None
-        if 'Focus Score' in period_df.columns:
-            focus = pd.to_numeric(period_df['Focus Score'], errors='coerce')
-            stats['Focus_mean'] = float(focus.mean(skipna=True)) if not focus.dropna().empty else None
-            stats['Focus_std'] = float(focus.std(skipna=True)) if not focus.dropna().empty else None
-
-    summary.append(stats)
+            'Start_s': float(time_s[bounds[i]]),
+            'End_s': float(time_s[bounds[i + 1] - 1]),
+            'Samples': int(size),
+            **stat_template
+        }
+
+        # Process band data
+        for band, col in band_cols.items():
+            row[f'{band}_mean'], row[f'{band}_std'], row[f'{band}_max'] = \
+                column_stats(col, i, ['mean', 'std', 'max'])
+
+        # Add percentages if powers CSV
+        for band, col in percent_cols.items():
+            row[f'{band}_percent_mean'], = column_stats(col, i, ['mean'])
+
+        # Add relaxation/focus scores if powers CSV
+        for name, col in score_cols.items():
+            row[f'{name}_mean'], row[f'{name}_std'] = column_stats(col, i, ['mean', 'std'])
+
+        yield row
+
+
+def dump_row(row):
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(row, indent=2)
+
 
 # -----------------------------
 # PRINT PASTE-READY JSON
 # -----------------------------
-print(json.dumps(summary, indent=2))
+# Written one period at a time, so neither the whole summary nor its JSON
+# text is ever held in memory. The layout matches dumping the list at once
+separator = '[\n  '
+for row in period_rows():
+    sys.stdout.write(separator + dump_row(row).replace('\n', '\n  '))
+    separator = ',\n  '
+print('[]' if separator == '[\n  ' else '\n]')
@@ -1,19 +1,44 @@
-import matplotlib.pyplot as plt
+import os
+import sys
+import matplotlib
+from concurrent.futures import ThreadPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
 import numpy as np
 import pandas as pd
-from scipy.signal import butter, filtfilt
-from tkinter import Tk, filedialog
+from scipy.signal import butter, sosfiltfilt
+
+# Batch runs (EEG_BATCH=<output dir>) render off-screen and save every figure
+# there as a PNG instead of opening windows
+PLOT_DIR = os.environ.get('EEG_BATCH')
+if PLOT_DIR:
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+try:
+    import pyarrow  # noqa: F401 - lets pandas use its multithreaded CSV reader
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; rolling_stats falls back to NumPy
+    njit = None
+    prange = range
 
 # -----------------------------
 # Configuration
 # -----------------------------
 MINUTES_PER_PERIOD = 1  # How many minutes in each analysis period
 FS_FALLBACK = 83.33     # Fallback sampling rate if detection fails
+PLOT_MAX_POINTS = 4000  # Most points drawn per trace (stats use every sample)
+PLOT_DPI = 100          # Resolution of figures saved in batch runs
 
 # -----------------------------
 # Helper: Bandpass filter
 # -----------------------------
-def bandpass(data, lowcut, highcut, fs, order=4):
+def bandpass_sos(lowcut, highcut, fs, order=4):
+    """Butterworth bandpass design, as second-order sections for sosfiltfilt"""
     nyq = 0.5 * fs
     if nyq <= 0:
         raise ValueError("Sampling rate must be positive for bandpass filter")
@@ -24,29 +49,125 @@ def bandpass(data, lowcut, highcut, fs, order=4):
         high_freq = min(lowcut * 1.25, nyq * 0.99)
     high = high_freq / nyq
 
-    b, a = butter(order, [low, high], btype='band')
-    return filtfilt(b, a, data)
+    # Second-order sections: the (b, a) form of a narrow low-frequency band
+    # (e.g. Delta at ~83 Hz) is numerically ill-conditioned
+    return butter(order, [low, high], btype='band', output='sos')
+
+# -----------------------------
+# Helper: Gap filling
+# -----------------------------
+def fill_gaps(mat):
+    """Linearly interpolate the NaN gaps of each column over sample position,
+    holding the first/last value at the ends; all-NaN columns stay NaN"""
+    filled = mat.copy()
+    pos = np.arange(len(mat))
+    for k in range(mat.shape[1]):
+        valid = ~np.isnan(mat[:, k])
+        if valid.any() and not valid.all():
+            filled[:, k] = np.interp(pos, pos[valid], mat[valid, k])
+    return filled
+
+# -----------------------------
+# Helper: Rolling mean & std
+# -----------------------------
+def _rolling_stats_sliding(mat, scale, window):
+    """Trailing rolling mean and std (ddof=1) over up to window samples of
+    every column of mat / scale, updating a running mean/sum of squares as
+    samples enter and leave"""
+    n, n_cols = mat.shape
+    means = np.empty((n, n_cols))
+    stds = np.full((n, n_cols), np.nan)
+    for j in prange(n_cols):
+        mean = 0.0
+        m2 = 0.0
+        count = 0
+        for i in range(n):
+            x = mat[i, j] / scale[j]
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+            if i >= window:
+                old = mat[i - window, j] / scale[j]
+                count -= 1
+                delta = old - mean
+                mean -= delta / count
+                m2 -= delta * (old - mean)
+            means[i, j] = mean
+            if count > 1:
+                stds[i, j] = np.sqrt(max(m2, 0.0) / (count - 1))
+    return means, stds
+
+
+def _rolling_mean_std_numpy(x, window, block=65536):
+    n = len(x)
+    means = np.empty(n)
+    stds = np.full(n, np.nan)
+    # Partial windows at the start
+    for i in range(min(window - 1, n)):
+        means[i] = x[:i + 1].mean()
+        if i:
+            stds[i] = x[:i + 1].std(ddof=1)
+    # Full windows as strided views, a block at a time to bound the temporaries
+    if n >= window:
+        windows = sliding_window_view(x, window)
+        for start in range(0, len(windows), block):
+            chunk = windows[start:start + block]
+            means[window - 1 + start:window - 1 + start + len(chunk)] = chunk.mean(axis=1)
+            stds[window - 1 + start:window - 1 + start + len(chunk)] = chunk.std(axis=1, ddof=1)
+    return means, stds
+
+
+def _rolling_stats_numpy(mat, scale, window):
+    mat = mat / scale
+    means = np.empty(mat.shape)
+    stds = np.empty(mat.shape)
+    for k in range(mat.shape[1]):
+        means[:, k], stds[:, k] = _rolling_mean_std_numpy(np.ascontiguousarray(mat[:, k]), window)
+    return means, stds
+
+
+# cache=True keeps the compiled kernel on disk, so only the very first run
+# pays for compiling it
+if njit is not None:
+    rolling_stats = njit(parallel=True, cache=True)(_rolling_stats_sliding)
+else:
+    rolling_stats = _rolling_stats_numpy
 
 # -----------------------------
 # Load CSV
 # -----------------------------
-Tk().withdraw()
-csv_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+if len(sys.argv) > 1:
+    csv_path = sys.argv[1]
+else:
+    from tkinter import Tk, filedialog
+    Tk().withdraw()
+    csv_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
 if not csv_path:
     raise SystemExit("No CSV selected")
 
-df = pd.read_csv(csv_path)
-df = df.replace(r'^\s*$', np.nan, regex=True)
+bands = ['Delta', 'Theta', 'Alpha', 'Beta', 'Gamma', 'SMR']
+band_cols = [f'{band} Brainwave Voltage(µV)' for band in bands]
 
+# Peek at the header to pick the time column, then load only the columns we use
+header = pd.read_csv(csv_path, nrows=0).columns
 time_col = None
 for candidate in ['Practice Timestamp (ms)', 'timestamp_ms', 'timestamp', 'Time (s)', 'Time (min)']:
-    if candidate in df.columns:
+    if candidate in header:
         time_col = candidate
         break
 
 if time_col is None:
     raise SystemExit("No timestamp column found in CSV")
 
+# Blank cells are read as NaN; anything else non-numeric is coerced below
+df = pd.read_csv(csv_path, usecols=[col for col in header if col == time_col or col in band_cols],
+                 na_values=[' '], engine=CSV_ENGINE)
+
+# Parse the band columns to numbers once; everything downstream works on them
+# as plain float arrays
+df[band_cols] = df[band_cols].apply(pd.to_numeric, errors='coerce')
+
 time_numeric = pd.to_numeric(df[time_col], errors='coerce')
 
 if 'min' in time_col.lower():
@@ -59,7 +180,9 @@ else:
     df['Time (s)'] = time_numeric
     df['Time (min)'] = df['Time (s)'] / 60.0
 
-df = df.sort_values('Time (s)').reset_index(drop=True)
+# Recordings are almost always written in time order; only sort when they aren't
+if not df['Time (s)'].is_monotonic_increasing:
+    df = df.sort_values('Time (s)').reset_index(drop=True)
 
 time_diffs = df['Time (s)'].diff().dropna()
 time_diffs = time_diffs[time_diffs > 0]
@@ -70,41 +193,68 @@ else:
 
 print(f"Estimated sampling rate: {fs_estimate:.2f} Hz")
 
-bands = ['Delta', 'Theta', 'Alpha', 'Beta', 'Gamma', 'SMR']
 fs = fs_estimate
 
 # -----------------------------
 # Apply filter
 # -----------------------------
-filtered_df = df.copy()
-for band in bands:
-    col = f'{band} Brainwave Voltage(µV)'
-    # Typical EEG band ranges in Hz
-    ranges = {
-        'Delta': (0.5, 4),
-        'Theta': (4, 8),
-        'Alpha': (8, 12),
-        'Beta': (12, 30),
-        'Gamma': (30, 45),
-        'SMR': (12, 15)
-    }
-    low, high = ranges[band]
-    series = pd.to_numeric(df[col], errors='coerce')
-    filled = series.interpolate(limit_direction='both')
-    if filled.isna().all():
-        filtered_df[col] = series
-        continue
-    filtered_values = bandpass(filled.values, low, high, fs)
-    filtered_values = np.where(series.isna(), np.nan, filtered_values)
-    filtered_df[col] = filtered_values
+# Typical EEG band ranges in Hz
+ranges = {
+    'Delta': (0.5, 4),
+    'Theta': (4, 8),
+    'Alpha': (8, 12),
+    'Beta': (12, 30),
+    'Gamma': (30, 45),
+    'SMR': (12, 15)
+}
+# The sampling rate and band edges are fixed for the run, so each band's
+# filter is designed once
+band_sos = {band: bandpass_sos(low, high, fs) for band, (low, high) in ranges.items()}
+
+# Gather every band into one (samples, bands) matrix, gap-fill it, filter
+# each column with its band's passband and write all bands back at once.
+# Columns sharing a passband go through one sosfiltfilt call along axis 0;
+# distinct passbands are independent and SciPy's filter loop releases the
+# GIL, so they are filtered on a thread each
+raw_mat = df[band_cols].to_numpy(dtype=np.float64)
+filled_mat = fill_gaps(raw_mat)
+filtered_mat = raw_mat.copy()
+filter_groups = {}
+for k, band in enumerate(bands):
+    if not np.isnan(filled_mat[:, k]).all():
+        filter_groups.setdefault(ranges[band], []).append(k)
+
+def filter_group(cols):
+    return sosfiltfilt(band_sos[bands[cols[0]]], filled_mat[:, cols], axis=0)
+
+jobs = list(filter_groups.values())
+with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as pool:
+    for cols, filtered_values in zip(jobs, pool.map(filter_group, jobs)):
+        filtered_mat[:, cols] = filtered_values
+filtered_mat[np.isnan(raw_mat)] = np.nan
+
+# Only the filtered bands differ from df, so start from its time axis alone
+# rather than copying every column
+filtered_df = pd.DataFrame({'Time (s)': df['Time (s)'].to_numpy(), 'Time (min)': df['Time (min)'].to_numpy()},
+                           index=df.index)
+filtered_df[band_cols] = filtered_mat
 
 # -----------------------------
 # Compute absolute values
 # -----------------------------
-for df_use in [df, filtered_df]:
-    for band in bands:
-        vals = pd.to_numeric(df_use[f'{band} Brainwave Voltage(µV)'], errors='coerce')
-        df_use[f'{band}_abs'] = vals.abs()
+# Kept as (samples, bands) matrices for the plots, and as the
+# {band}_abs columns for the period analysis
+abs_cols = [f'{band}_abs' for band in bands]
+raw_abs_mat = np.abs(raw_mat)
+filt_abs_mat = np.abs(filtered_mat)
+df[abs_cols] = raw_abs_mat
+filtered_df[abs_cols] = filt_abs_mat
+
+# Gap-filled copies for the rolling plots (interpolated, zeros where a band
+# has no data at all)
+raw_abs_filled = np.nan_to_num(fill_gaps(raw_abs_mat), nan=0.0)
+filt_abs_filled = np.nan_to_num(fill_gaps(filt_abs_mat), nan=0.0)
+time_min = df['Time (min)'].to_numpy()
 
 # -----------------------------
 # Period analysis
@@ -113,35 +263,49 @@ total_time = df['Time (min)'].max()
 period_duration = MINUTES_PER_PERIOD
 num_periods = int(np.ceil(total_time / period_duration))
 
+# Period i covers [i*period_duration, (i+1)*period_duration). Each sample's
+# period index is found once by binary search over the period edges;
+# samples outside every period (or without a time) fall outside 0..num_periods-1
+period_edges = np.arange(num_periods + 1) * period_duration
+
 def analyze(df_use, label="Raw"):
     print(f"\n\n===== {label} DATA ANALYSIS =====")
+    period_idx = np.searchsorted(period_edges, df_use['Time (min)'].to_numpy(), side='right') - 1
+    # Per-sample band ratios, averaged per period alongside the band means
+    epsilon = 1e-10
+    frame = df_use[abs_cols].assign(
+        theta_beta=df_use['Theta_abs'] / (df_use['Beta_abs'] + epsilon),
+        delta_alpha=df_use['Delta_abs'] / (df_use['Alpha_abs'] + epsilon))
+    # Every period's statistics in one grouped pass instead of masking the
+    # frame for each period
+    grouped = frame.groupby(period_idx)
+    periods = pd.RangeIndex(num_periods)
+    sizes = grouped.size().reindex(periods, fill_value=0)
+    counts = grouped[abs_cols].count().reindex(periods, fill_value=0)
+    means = grouped.mean().reindex(periods)
+    stds = grouped[abs_cols].std(ddof=0).reindex(periods)
+    maxs = grouped[abs_cols].max().reindex(periods)
+
     period_data = []
     for i in range(num_periods):
-        start = i * period_duration
-        end = (i + 1) * period_duration
-        period_df = df_use[(df_use['Time (min)'] >= start) & (df_use['Time (min)'] < end)]
-        print(f"\nPeriod {i+1}: {start:.1f}-{end:.1f} min ({len(period_df)} samples)")
+        start = period_edges[i]
+        end = period_edges[i + 1]
+        print(f"\nPeriod {i+1}: {start:.1f}-{end:.1f} min ({sizes[i]} samples)")
         stats = {}
         for band in bands:
-            vals = pd.to_numeric(period_df[f'{band}_abs'], errors='coerce')
-            if vals.dropna().empty:
+            col = f'{band}_abs'
+            if not counts.at[i, col]:
                 stats[band] = np.nan
                 print(f"  {band:6}: insufficient data")
                 continue
-            mean_val = np.nanmean(vals)
-            std_val = np.nanstd(vals)
-            max_val = np.nanmax(vals)
+            mean_val = means.at[i, col]
+            std_val = stds.at[i, col]
+            max_val = maxs.at[i, col]
             stats[band] = mean_val
             print(f"  {band:6}: Mean={mean_val:.3f} µV  Std={std_val:.3f}  Max={max_val:.3f}")
         # Ratios
-        epsilon = 1e-10
-        theta_vals = pd.to_numeric(period_df['Theta_abs'], errors='coerce')
-        beta_vals = pd.to_numeric(period_df['Beta_abs'], errors='coerce')
-        delta_vals = pd.to_numeric(period_df['Delta_abs'], errors='coerce')
-        alpha_vals = pd.to_numeric(period_df['Alpha_abs'], errors='coerce')
-
-        theta_beta = np.nanmean(theta_vals / (beta_vals + epsilon)) if not theta_vals.dropna().empty else np.nan
-        delta_alpha = np.nanmean(delta_vals / (alpha_vals + epsilon)) if not delta_vals.dropna().empty else np.nan
+        theta_beta = means.at[i, 'theta_beta']
+        delta_alpha = means.at[i, 'delta_alpha']
         stats['theta_beta'] = theta_beta
         stats['delta_alpha'] = delta_alpha
         print(f"  Theta/Beta ratio: {theta_beta:.3f}" if not np.isnan(theta_beta) else "  Theta/Beta ratio: n/a")
@@ -165,119 +329,125 @@ band_colors = {
     'SMR': '#8c564b'      # Brown
 }
 
-def plot_bands(df_use, title="EEG Bands", normalize=True):
-    plt.figure(figsize=(12,6))
-    for band in bands:
-        y = df_use[f'{band}_abs'].values
-        if normalize:
-            y = y / (np.max(y)+1e-10)
-        plt.plot(df_use['Time (min)'], y, label=band, color=band_colors[band])
+def decimate(t, *series, max_points=PLOT_MAX_POINTS):
+    """Every step-th sample of t and each series, so that at most about
+    max_points are handed to matplotlib"""
+    step = max(1, len(t) // max_points)
+    return (t[::step],) + tuple(y[::step] for y in series)
+
+def normalize_columns(mat):
+    """Each band column scaled to its own peak, in one reduction over the matrix"""
+    return mat / (mat.max(axis=0) + 1e-10)
+
+def show(fig, name):
+    """Open fig in a window, or save it as <name>.png in a batch run"""
+    if PLOT_DIR:
+        os.makedirs(PLOT_DIR, exist_ok=True)
+        fig.savefig(os.path.join(PLOT_DIR, f"{name}.png"), dpi=PLOT_DPI)
+        plt.close(fig)
+    else:
+        plt.show()
+
+def plot_bands(t, abs_mat, title="EEG Bands", normalize=True, name="bands"):
+    fig = plt.figure(figsize=(12,6))
+    if normalize:
+        abs_mat = normalize_columns(abs_mat)
+    for k, band in enumerate(bands):
+        y = abs_mat[:, k]
+        plt.plot(*decimate(t, y), label=band, color=band_colors[band])
     plt.xlabel("Time (min)")
     plt.ylabel("Normalized Amplitude" if normalize else "µV")
     plt.title(title)
     plt.legend()
     plt.grid(True)
-    plt.show()
+    show(fig, name)
 
-plot_bands(df, title="Raw EEG Bands (Normalized)")
-plot_bands(filtered_df, title="Filtered EEG Bands (Normalized)")
+plot_bands(time_min, raw_abs_mat, title="Raw EEG Bands (Normalized)", name="raw_bands")
+plot_bands(time_min, filt_abs_mat, title="Filtered EEG Bands (Normalized)", name="filtered_bands")
 
 # -----------------------------
 # Separate Raw and Filtered plots with consistent coloring
 # -----------------------------
-def plot_raw_separate(df_raw, normalize=True):
+def rolling_band_stats(mat, window=50, normalize=True):
+    """Rolling mean and std of every band column, each scaled to its peak
+    first when normalize is set"""
+    # Scaling happens inside the rolling pass rather than as a separate
+    # normalised copy of the matrix
+    if normalize:
+        scale = mat.max(axis=0) + 1e-10
+    else:
+        scale = np.ones(mat.shape[1])
+    return rolling_stats(mat, scale, window)
+
+# Computed once and shared by the separate and overlay plots
+raw_rolling = rolling_band_stats(raw_abs_filled)
+filt_rolling = rolling_band_stats(filt_abs_filled)
+
+def plot_raw_separate(ax, t, raw_rolling, normalize=True):
     """Plot raw data only"""
-    plt.figure(figsize=(14,6))
+    raw_means, raw_stds = raw_rolling
     
-    for band in bands:
-        raw = pd.to_numeric(df_raw[f'{band}_abs'], errors='coerce').interpolate(limit_direction='both').fillna(0).values
-        if normalize:
-            raw = raw / (np.max(raw)+1e-10)
-        
-        # Compute mean and std over small rolling window for smoothness
-        window = 50
-        raw_mean = pd.Series(raw).rolling(window, min_periods=1).mean()
-        raw_std  = pd.Series(raw).rolling(window, min_periods=1).std()
-        
-        t = df_raw['Time (min)']
+    for k, band in enumerate(bands):
+        t_plot, raw_mean, raw_std = decimate(t, raw_means[:, k], raw_stds[:, k])
         
         # Raw line + envelope with consistent color
-        plt.plot(t, raw_mean, label=f"{band}", linestyle='-', color=band_colors[band])
-        plt.fill_between(t, raw_mean-raw_std, raw_mean+raw_std, alpha=0.2, color=band_colors[band])
+        ax.plot(t_plot, raw_mean, label=f"{band}", linestyle='-', color=band_colors[band])
+        ax.fill_between(t_plot, raw_mean-raw_std, raw_mean+raw_std, alpha=0.2, color=band_colors[band],
+                        rasterized=True)
     
-    plt.xlabel("Time (min)")
-    plt.ylabel("Normalized Amplitude" if normalize else "µV")
-    plt.title("Raw EEG Bands (with Rolling Mean & Std)")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    ax.set_ylabel("Normalized Amplitude" if normalize else "µV")
+    ax.set_title("Raw EEG Bands (with Rolling Mean & Std)")
+    ax.legend()
+    ax.grid(True)
 
-def plot_filtered_separate(df_filt, normalize=True):
+def plot_filtered_separate(ax, t, filt_rolling, normalize=True):
     """Plot filtered data only"""
-    plt.figure(figsize=(14,6))
+    filt_means, filt_stds = filt_rolling
     
-    for band in bands:
-        filt = pd.to_numeric(df_filt[f'{band}_abs'], errors='coerce').interpolate(limit_direction='both').fillna(0).values
-        if normalize:
-            filt = filt / (np.max(filt)+1e-10)
-        
-        # Compute mean and std over small rolling window for smoothness
-        window = 50
-        filt_mean = pd.Series(filt).rolling(window, min_periods=1).mean()
-        filt_std  = pd.Series(filt).rolling(window, min_periods=1).std()
-        
-        t = df_filt['Time (min)']
+    for k, band in enumerate(bands):
+        t_plot, filt_mean, filt_std = decimate(t, filt_means[:, k], filt_stds[:, k])
         
         # Filtered line + envelope with consistent color
-        plt.plot(t, filt_mean, label=f"{band}", linestyle='-', color=band_colors[band])
-        plt.fill_between(t, filt_mean-filt_std, filt_mean+filt_std, alpha=0.2, color=band_colors[band])
+        ax.plot(t_plot, filt_mean, label=f"{band}", linestyle='-', color=band_colors[band])
+        ax.fill_between(t_plot, filt_mean-filt_std, filt_mean+filt_std, alpha=0.2, color=band_colors[band],
+                        rasterized=True)
     
-    plt.xlabel("Time (min)")
-    plt.ylabel("Normalized Amplitude" if normalize else "µV")
-    plt.title("Filtered EEG Bands (with Rolling Mean & Std)")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    ax.set_ylabel("Normalized Amplitude" if normalize else "µV")
+    ax.set_title("Filtered EEG Bands (with Rolling Mean & Std)")
+    ax.legend()
+    ax.grid(True)
 
 # -----------------------------
 # Overlay raw vs filtered plot
 # -----------------------------
-def plot_raw_vs_filtered(df_raw, df_filt, normalize=True):
-    plt.figure(figsize=(14,7))
+def plot_raw_vs_filtered(ax, t, raw_rolling, filt_rolling, normalize=True):
+    raw_means, raw_stds = raw_rolling
+    filt_means, filt_stds = filt_rolling
     
-    for band in bands:
-        raw = pd.to_numeric(df_raw[f'{band}_abs'], errors='coerce').interpolate(limit_direction='both').fillna(0).values
-        filt = pd.to_numeric(df_filt[f'{band}_abs'], errors='coerce').interpolate(limit_direction='both').fillna(0).values
-        if normalize:
-            raw = raw / (np.max(raw)+1e-10)
-            filt = filt / (np.max(filt)+1e-10)
-        
-        # Compute mean and std over small rolling window for smoothness
-        window = 50
-        raw_mean = pd.Series(raw).rolling(window, min_periods=1).mean()
-        raw_std  = pd.Series(raw).rolling(window, min_periods=1).std()
-        filt_mean = pd.Series(filt).rolling(window, min_periods=1).mean()
-        filt_std  = pd.Series(filt).rolling(window, min_periods=1).std()
-        
-        t = df_raw['Time (min)']
+    for k, band in enumerate(bands):
+        t_plot, raw_mean, raw_std, filt_mean, filt_std = decimate(
+            t, raw_means[:, k], raw_stds[:, k], filt_means[:, k], filt_stds[:, k])
         
         # Raw line + envelope with consistent color
-        plt.plot(t, raw_mean, label=f"{band} Raw", linestyle='-', color=band_colors[band], alpha=0.7)
-        plt.fill_between(t, raw_mean-raw_std, raw_mean+raw_std, alpha=0.15, color=band_colors[band])
+        ax.plot(t_plot, raw_mean, label=f"{band} Raw", linestyle='-', color=band_colors[band], alpha=0.7)
+        ax.fill_between(t_plot, raw_mean-raw_std, raw_mean+raw_std, alpha=0.15, color=band_colors[band],
+                        rasterized=True)
         
         # Filtered line + envelope with consistent color (dashed)
-        plt.plot(t, filt_mean, label=f"{band} Filtered", linestyle='--', color=band_colors[band])
-        plt.fill_between(t, filt_mean-filt_std, filt_mean+filt_std, alpha=0.15, color=band_colors[band])
+        ax.plot(t_plot, filt_mean, label=f"{band} Filtered", linestyle='--', color=band_colors[band])
+        ax.fill_between(t_plot, filt_mean-filt_std, filt_mean+filt_std, alpha=0.15, color=band_colors[band],
+                        rasterized=True)
     
-    plt.xlabel("Time (min)")
-    plt.ylabel("Normalized Amplitude" if normalize else "µV")
-    plt.title("Raw vs Filtered EEG Bands")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
-
-# Call all plotting functions
-plot_raw_separate(df)
-plot_filtered_separate(filtered_df)
-plot_raw_vs_filtered(df, filtered_df)
+    ax.set_ylabel("Normalized Amplitude" if normalize else "µV")
+    ax.set_title("Raw vs Filtered EEG Bands")
+    ax.legend()
+    ax.grid(True)
 
+# Draw the rolling plots into one window sharing the time axis
+fig, (ax_raw, ax_filt, ax_both) = plt.subplots(3, 1, sharex=True, figsize=(14,14))
+plot_raw_separate(ax_raw, time_min, raw_rolling)
+plot_filtered_separate(ax_filt, time_min, filt_rolling)
+plot_raw_vs_filtered(ax_both, time_min, raw_rolling, filt_rolling)
+ax_both.set_xlabel("Time (min)")
+fig.tight_layout()
+show(fig, "rolling_bands")
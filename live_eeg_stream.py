@@ -4,13 +4,127 @@ Decodes packets in real-time and computes band powers on sliding windows
 """
 
 import asyncio
+import collections
+import logging
+import queue
 import struct
+import sys
 import time
-from collections import deque
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 import numpy as np
 from bleak import BleakScanner, BleakClient
-from process import decode_serenibrain_packet, calculate_band_powers
+from process import (decode_serenibrain_packet, calculate_band_powers, iter_channel_voltages,
+                     WELCH_NPERSEG)
+
+# Stream control commands (discovered from BT log analysis); immutable bytes
+CMD_START_STREAM = bytes([0x43, 0x54, 0x52, 0x4C, 0x00, 0x03, 0x00, 0x05])  # "CTRL" + start
+CMD_PLAY = bytes([0x43, 0x54, 0x52, 0x4C, 0x00, 0x04, 0x00, 0x01])          # "CTRL" + play/resume
+CMD_STOP_STREAM = bytes([0x43, 0x54, 0x52, 0x4C, 0x00, 0x03, 0x00, 0x03])   # "CTRL" + stop
+CMD_KEEP_ALIVE = bytes([0x43, 0x54, 0x52, 0x4C, 0x00, 0x05, 0x00, 0x02])    # "CTRL" + keepalive
+KEEP_ALIVE_INTERVAL = 1.0  # seconds
+
+# Per-packet progress and analysis reports are logged rather than printed so
+# the terminal write happens on a listener thread, not the BLE callback
+log = logging.getLogger(__name__)
+
+
+def start_log_listener(stream=None):
+    """
+    Send this module's log messages to stream (default stdout) from a
+    background thread; returns the started QueueListener to stop() on exit
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.handlers[:] = [QueueHandler(log_queue)]
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+class SampleRing:
+    """Fixed-capacity ring of one channel's most recent samples, kept as
+    preallocated timestamp and voltage arrays rather than per-sample tuples
+    
+    Also keeps a running mean and sum of squared deviations (windowed
+    Welford, merged a batch at a time) over the latest `window` voltages,
+    so an analysis of that window needn't rescan it for its DC offset."""
+    
+    def __init__(self, capacity, window=None):
+        self.timestamps = np.empty(capacity)
+        self.voltages = np.empty(capacity)
+        self.write_idx = 0
+        self.filled = 0
+        self.written = 0  # samples ever stored (never wraps)
+        self.window = min(window or capacity, capacity)
+        self.count = 0  # samples covered by mean/m2 (min(filled, window))
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def __len__(self):
+        return self.filled
+    
+    def extend(self, timestamp, voltages):
+        """Store a batch of samples sharing one timestamp, overwriting the
+        oldest once full; at most two slice writes however many there are"""
+        capacity = len(self.voltages)
+        voltages = voltages[-capacity:]
+        n = len(voltages)
+        self._update_stats(voltages)
+        first = min(n, capacity - self.write_idx)
+        end = self.write_idx + first
+        self.timestamps[self.write_idx:end] = timestamp
+        self.voltages[self.write_idx:end] = voltages[:first]
+        if first < n:
+            self.timestamps[:n - first] = timestamp
+            self.voltages[:n - first] = voltages[first:]
+        self.write_idx = (self.write_idx + n) % capacity
+        self.filled = min(self.filled + n, capacity)
+        self.written += n
+    
+    def _update_stats(self, new):
+        """Fold a batch into the window stats and drop the samples it pushes
+        out of the window (call before the batch is written)"""
+        if len(new) >= self.window:
+            tail = new[-self.window:]
+            self.count, self.mean = len(tail), tail.mean()
+            self.m2 = np.sum((tail - self.mean) ** 2)
+            return
+        
+        # A packet adds only a few samples per channel, so plain-float
+        # Welford steps beat NumPy calls on tiny arrays
+        count, mean, m2 = self.count, self.mean, self.m2
+        for x in new.tolist():
+            count += 1
+            d = x - mean
+            mean += d / count
+            m2 += d * (x - mean)
+        
+        # Reverse steps for the oldest samples now outside the window
+        drop = count - self.window
+        if drop > 0:
+            for x in self.latest(self.count)[:drop].tolist():
+                count -= 1
+                d = x - mean
+                mean -= d / count
+                m2 -= d * (x - mean)
+        
+        self.count, self.mean, self.m2 = count, mean, max(m2, 0.0)
+    
+    def stats(self):
+        """(mean, population variance) of the latest `window` voltages"""
+        return self.mean, (self.m2 / self.count if self.count else 0.0)
+    
+    def latest(self, n):
+        """The most recent min(n, len(self)) voltages, oldest first"""
+        n = min(n, self.filled)
+        start = self.write_idx - n
+        if start >= 0:
+            return self.voltages[start:self.write_idx]
+        return np.concatenate((self.voltages[start:], self.voltages[:self.write_idx]))
 
 
 class EEGStreamProcessor:
@@ -28,15 +142,32 @@ class EEGStreamProcessor:
         self.adc_scale = adc_scale
         
         # Buffer for each channel (circular buffer)
-        self.channel_buffers = {}  # channel_id -> deque of (timestamp, voltage_uv)
+        self.channel_buffers = {}  # channel_id -> SampleRing of (timestamp, voltage_uv)
         self.max_buffer_samples = int(window_duration * sampling_rate * 1.5)  # 1.5x for safety
+        self.window_samples = int(window_duration * sampling_rate)  # samples per analysis
         
         # Statistics
         self.packet_count = 0
         self.sample_count = 0
-        self.start_time = None
-        self.last_analysis_time = {}  # channel_id -> timestamp of last analysis
+        self.start_time = None  # wall-clock time of the first packet
+        self.start_ns = None  # monotonic_ns of the first packet; durations use this
         self.analysis_interval = 2.0  # Analyze every 2 seconds
+        self.analysis_interval_ns = int(self.analysis_interval * 1e9)
+        self.next_analysis_time = {}  # channel_id -> monotonic_ns its next analysis is due
+        self.next_any_analysis = float('inf')  # earliest of next_analysis_time
+        self.last_analyzed_count = {}  # channel_id -> ring.written at its last analysis
+        # Half a Welch segment, or half the samples one interval should bring
+        # at low rates so ordinary jitter doesn't skip analyses; fewer new
+        # samples than this means a stalled stream
+        self.min_new_samples = min(WELCH_NPERSEG // 2,
+                                   int(self.analysis_interval * sampling_rate) // 2)
+        
+        # The BLE handler only queues raw packets; process_packet (decoding and
+        # ring writes) runs in the loop's drain callback and, once a loop is
+        # set, hands band-power analysis to a worker thread
+        self.loop = None  # event loop to schedule analyses on (None = run inline)
+        self.analysis_in_flight = set()  # channels with an analysis still running
+        self.analysis_tasks = set()  # strong refs to running analysis tasks
         
     def process_packet(self, data):
         """Process incoming BLE notification packet"""
@@ -46,93 +177,132 @@ class EEGStreamProcessor:
             
             if packet['packet_type'] == 1:
                 # Status packet
-                print(f"\n[Status] Device: {packet.get('device_model', 'Unknown')}")
+                log.info(f"\n[Status] Device: {packet.get('device_model', 'Unknown')}")
                 return
             
-            if packet['packet_type'] != 2 or not packet['samples']:
+            if packet['packet_type'] != 2 or not packet['num_samples']:
                 return
             
             self.packet_count += 1
-            current_time = time.time()
+            # Monotonic integer ns for scheduling; ring timestamps in seconds
+            current_ns = time.monotonic_ns()
+            current_time = current_ns / 1e9
             
-            if self.start_time is None:
-                self.start_time = current_time
+            if self.start_ns is None:
+                self.start_ns = current_ns
+                self.start_time = time.time()
             
-            # Add samples to channel buffers
-            for sample in packet['samples']:
-                ch = sample['channel']
-                voltage = sample['voltage_uv']
-                
+            # Add samples to channel buffers, one batch write per channel
+            for ch, voltages in iter_channel_voltages(packet['samples']):
                 # Initialize buffer for new channel
                 if ch not in self.channel_buffers:
-                    self.channel_buffers[ch] = deque(maxlen=self.max_buffer_samples)
-                    self.last_analysis_time[ch] = current_time
+                    self.channel_buffers[ch] = SampleRing(self.max_buffer_samples,
+                                                          window=self.window_samples)
+                    self.next_analysis_time[ch] = current_ns + self.analysis_interval_ns
+                    self.next_any_analysis = min(self.next_any_analysis, self.next_analysis_time[ch])
                 
-                # Add sample with timestamp
-                self.channel_buffers[ch].append((current_time, voltage))
-                self.sample_count += 1
+                # Add samples with the packet's timestamp
+                self.channel_buffers[ch].extend(current_time, voltages)
+            self.sample_count += packet['num_samples']
             
-            # Check if it's time to analyze
-            for ch in self.channel_buffers:
-                if current_time - self.last_analysis_time[ch] >= self.analysis_interval:
-                    self._analyze_channel(ch, current_time)
-                    self.last_analysis_time[ch] = current_time
+            # Check if it's time to analyze (one comparison unless a channel is due)
+            if current_ns >= self.next_any_analysis:
+                for ch, due in self.next_analysis_time.items():
+                    if current_ns >= due:
+                        # Skip re-analysing (nearly) the same window during BLE stalls
+                        written = self.channel_buffers[ch].written
+                        if (written - self.last_analyzed_count.get(ch, 0) >= self.min_new_samples
+                                and self._analyze_channel(ch)):
+                            self.last_analyzed_count[ch] = written
+                        self.next_analysis_time[ch] = current_ns + self.analysis_interval_ns
+                self.next_any_analysis = min(self.next_analysis_time.values())
             
             # Print progress every 10 packets
             if self.packet_count % 10 == 0:
-                elapsed = current_time - self.start_time
+                elapsed = (current_ns - self.start_ns) / 1e9
                 rate = self.packet_count / elapsed if elapsed > 0 else 0
-                print(f"[{self.packet_count:4d} pkts] {self.sample_count:5d} samples | "
-                      f"{rate:.1f} pkt/s | {len(self.channel_buffers)} channels")
+                log.info(f"[{self.packet_count:4d} pkts] {self.sample_count:5d} samples | "
+                         f"{rate:.1f} pkt/s | {len(self.channel_buffers)} channels")
         
         except Exception as e:
-            print(f"Error processing packet: {e}")
+            log.error(f"Error processing packet: {e}")
     
-    def _analyze_channel(self, channel_id, current_time):
-        """Analyze band powers for a channel"""
+    def _analyze_channel(self, channel_id):
+        """Analyze band powers for a channel; returns whether an analysis ran
+        or was dispatched to a worker"""
         buffer = self.channel_buffers[channel_id]
         
         if len(buffer) < 10:
-            return
-        
-        # Extract voltages from buffer (ignore timestamps for now)
-        voltages = [v for _, v in buffer]
+            return False
         
         # Only analyze if we have enough data
-        window_samples = int(self.window_duration * self.sampling_rate)
-        if len(voltages) < min(10, window_samples // 2):
-            return
+        window_samples = self.window_samples
+        if len(buffer) < min(10, window_samples // 2):
+            return False
+        
+        # Most recent window of voltages (ignore timestamps for now), and its
+        # mean from the ring's running stats
+        voltages = buffer.latest(window_samples)
+        mean, _ = buffer.stats()
         
+        if self.loop is None:
+            self._report_band_powers(channel_id, voltages, mean, len(buffer))
+            return True
+        if channel_id in self.analysis_in_flight:
+            # Skip (rather than queue) if the previous one hasn't finished
+            return False
+        # Already on the loop (drain callback); the copy keeps the worker off
+        # the ring later packets are written to
+        self.analysis_in_flight.add(channel_id)
+        self._start_analysis(channel_id, voltages.copy(), mean, len(buffer))
+        return True
+    
+    def _start_analysis(self, channel_id, voltages, mean, buffered):
+        """Create the worker-thread analysis task on the event loop"""
+        task = self.loop.create_task(self._run_analysis(channel_id, voltages, mean, buffered))
+        self.analysis_tasks.add(task)
+        task.add_done_callback(self.analysis_tasks.discard)
+    
+    async def _run_analysis(self, channel_id, voltages, mean, buffered):
+        try:
+            await asyncio.to_thread(self._report_band_powers, channel_id, voltages, mean, buffered)
+        finally:
+            self.analysis_in_flight.discard(channel_id)
+    
+    def _report_band_powers(self, channel_id, voltages, mean, buffered):
+        """Calculate and print band powers for one channel's window"""
         try:
-            # Calculate band powers
             analysis = calculate_band_powers(
-                voltages[-window_samples:] if len(voltages) > window_samples else voltages,
+                voltages,
                 sampling_rate=self.sampling_rate,
-                use_welch=True
+                use_welch=True,
+                mean=mean
             )
             
-            # Print results
+            # Report results as one preformatted message
             timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"\n{'='*70}")
-            print(f"[{timestamp}] Channel {channel_id} Analysis ({len(voltages)} samples)")
-            print(f"{'='*70}")
-            print(f"Signal Quality: {analysis['signal_quality']} (SNR: {analysis['snr_db']:.1f} dB)")
-            print(f"Dominant: {analysis['dominant_band'].upper()} | "
-                  f"Relax: {analysis['relaxation_score']:.0f} | "
-                  f"Focus: {analysis['attention_score']:.0f}")
-            
-            print(f"\nBand Ratios:")
+            lines = [
+                f"\n{'='*70}",
+                f"[{timestamp}] Channel {channel_id} Analysis ({buffered} samples)",
+                f"{'='*70}",
+                f"Signal Quality: {analysis['signal_quality']} (SNR: {analysis['snr_db']:.1f} dB)",
+                f"Dominant: {analysis['dominant_band'].upper()} | "
+                f"Relax: {analysis['relaxation_score']:.0f} | "
+                f"Focus: {analysis['attention_score']:.0f}",
+                f"\nBand Ratios:",
+            ]
             for band in ['delta', 'theta', 'alpha', 'beta', 'gamma']:
                 ratio = analysis['band_ratios'][band]
                 bar = '█' * int(ratio / 2)
-                print(f"  {band.capitalize():8s}: {ratio:5.1f}% {bar}")
+                lines.append(f"  {band.capitalize():8s}: {ratio:5.1f}% {bar}")
+            log.info('\n'.join(lines))
             
         except Exception as e:
-            print(f"Error analyzing channel {channel_id}: {e}")
+            log.error(f"Error analyzing channel {channel_id}: {e}")
     
     def get_statistics(self):
         """Return streaming statistics"""
-        elapsed = time.time() - self.start_time if self.start_time else 0
+        elapsed = (time.monotonic_ns() - self.start_ns) / 1e9 if self.start_ns is not None else 0
         return {
             'packets': self.packet_count,
             'samples': self.sample_count,
@@ -180,14 +350,25 @@ async def stream_eeg_data(device_address, characteristic_uuid=None, write_char_u
         adc_scale=100.0
     )
     
-    # Stream control commands (discovered from BT log analysis)
-    CMD_START_STREAM = bytearray([0x43, 0x54, 0x52, 0x4C, 0x00, 0x03, 0x00, 0x05])  # "CTRL" + start
-    CMD_STOP_STREAM = bytearray([0x43, 0x54, 0x52, 0x4C, 0x00, 0x03, 0x00, 0x03])   # "CTRL" + stop
-    CMD_KEEP_ALIVE = bytearray([0x43, 0x54, 0x52, 0x4C, 0x00, 0x05, 0x00, 0x02])    # "CTRL" + keepalive
+    # The BLE callback only queues the raw packet; one event-loop callback
+    # drains whatever has arrived, in order, however many notifications
+    # landed since it was scheduled
+    pending = collections.deque()
+    drain_scheduled = False
+    
+    def drain_packets():
+        nonlocal drain_scheduled
+        drain_scheduled = False
+        while pending:
+            processor.process_packet(pending.popleft())
     
     def notification_handler(sender, data):
         """Called when BLE notification arrives"""
-        processor.process_packet(data)
+        nonlocal drain_scheduled
+        pending.append(data)
+        if not drain_scheduled:
+            drain_scheduled = True
+            loop.call_soon_threadsafe(drain_packets)
     
     async with BleakClient(device_address) as client:
         print(f"\nConnected to {device_address}")
@@ -242,129 +423,143 @@ async def stream_eeg_data(device_address, characteristic_uuid=None, write_char_u
                 else:
                     print("Warning: No write characteristic found - streaming may not start!")
         
-        # Subscribe to notifications
-        print(f"\nSubscribing to notifications on {characteristic_uuid}...")
+        # Subscribe to notifications; analyses are offloaded onto this loop
+        # and their reports written by the log listener, which is stopped
+        # (flushing its queue) however the stream ends
+        loop = processor.loop = asyncio.get_running_loop()
+        log_listener = start_log_listener()
         try:
-            await client.start_notify(characteristic_uuid, notification_handler)
-            print("[OK] Subscribed to notifications")
-        except Exception as e:
-            print(f"Error subscribing: {e}")
-            return
-        
-        # CRITICAL 4-COMMAND INITIALIZATION SEQUENCE (discovered from BT log analysis)
-        # This exact sequence is required to trigger streaming!
-        if write_char_uuid:
-            print(f"\n{'='*70}")
-            print("SENDING 4-COMMAND INITIALIZATION SEQUENCE")
-            print(f"{'='*70}")
-            
+            print(f"\nSubscribing to notifications on {characteristic_uuid}...")
             try:
-                # Command 1: INIT/START
-                print("\n[1/4] Sending INIT command (CTRL 00 03 00 05)...")
-                await client.write_gatt_char(write_char_uuid, CMD_START_STREAM)
-                await asyncio.sleep(0.1)
-                print("      ✓ INIT command sent")
-                
-                # Command 2: PLAY/RESUME
-                CMD_PLAY = bytearray([0x43, 0x54, 0x52, 0x4C, 0x00, 0x04, 0x00, 0x01])
-                print("\n[2/4] Sending PLAY command (CTRL 00 04 00 01)...")
-                await client.write_gatt_char(write_char_uuid, CMD_PLAY)
-                await asyncio.sleep(0.1)
-                print("      ✓ PLAY command sent")
-                
-                # Command 3: STOP/RESET (counterintuitive but REQUIRED!)
-                print("\n[3/4] Sending STOP/RESET command (CTRL 00 03 00 03)...")
-                await client.write_gatt_char(write_char_uuid, CMD_STOP_STREAM)
-                await asyncio.sleep(0.1)
-                print("      ✓ STOP/RESET command sent")
-                
-                # Command 4: KEEP-ALIVE (triggers actual streaming)
-                print("\n[4/4] Sending KEEP-ALIVE command (CTRL 00 05 00 02)...")
-                await client.write_gatt_char(write_char_uuid, CMD_KEEP_ALIVE)
-                await asyncio.sleep(0.1)
-                print("      ✓ KEEP-ALIVE command sent")
-                
+                await client.start_notify(characteristic_uuid, notification_handler)
+                print("[OK] Subscribed to notifications")
+            except Exception as e:
+                print(f"Error subscribing: {e}")
+                return
+            
+            # CRITICAL 4-COMMAND INITIALIZATION SEQUENCE (discovered from BT log analysis)
+            # This exact sequence is required to trigger streaming! Each write waits
+            # for the device's acknowledgement (response=True), which keeps them in
+            # order without a blind sleep between commands
+            if write_char_uuid:
                 print(f"\n{'='*70}")
-                print("✓ INITIALIZATION COMPLETE - Waiting for data stream...")
-                print(f"{'='*70}\n")
+                print("SENDING 4-COMMAND INITIALIZATION SEQUENCE")
+                print(f"{'='*70}")
                 
-            except Exception as e:
-                print(f"\n✗ Error during initialization: {e}")
-                print("Continuing anyway - device may still stream...")
-        else:
-            print("\nWarning: No write characteristic - cannot send commands!")
-        
-        # Wait for data to start flowing
-        await asyncio.sleep(2)
-        
-        if processor.packet_count == 0:
-            print("\n[!] WARNING: No packets received after initialization!")
-            print("Troubleshooting:")
-            print("  1. Device may be in sleep mode - try power cycling")
-            print("  2. Check battery level")
-            print("  3. Make sure device is not connected to phone app")
-            print("\nContinuing to wait...")
-        else:
-            print(f"\n✓ SUCCESS! Receiving data ({processor.packet_count} packets so far)")
-        
-        # Start keep-alive loop (send every 1 second to maintain stream)
-        keep_alive_task = None
-        if write_char_uuid:
-            async def send_keep_alive():
                 try:
-                    while True:
-                        await asyncio.sleep(1.0)
-                        await client.write_gatt_char(write_char_uuid, CMD_KEEP_ALIVE, response=False)
-                except:
-                    pass
+                    # Command 1: INIT/START
+                    print("\n[1/4] Sending INIT command (CTRL 00 03 00 05)...")
+                    await client.write_gatt_char(write_char_uuid, CMD_START_STREAM, response=True)
+                    print("      ✓ INIT command sent")
+                    
+                    # Command 2: PLAY/RESUME
+                    print("\n[2/4] Sending PLAY command (CTRL 00 04 00 01)...")
+                    await client.write_gatt_char(write_char_uuid, CMD_PLAY, response=True)
+                    print("      ✓ PLAY command sent")
+                    
+                    # Command 3: STOP/RESET (counterintuitive but REQUIRED!)
+                    print("\n[3/4] Sending STOP/RESET command (CTRL 00 03 00 03)...")
+                    await client.write_gatt_char(write_char_uuid, CMD_STOP_STREAM, response=True)
+                    print("      ✓ STOP/RESET command sent")
+                    
+                    # Command 4: KEEP-ALIVE (triggers actual streaming)
+                    print("\n[4/4] Sending KEEP-ALIVE command (CTRL 00 05 00 02)...")
+                    await client.write_gatt_char(write_char_uuid, CMD_KEEP_ALIVE, response=True)
+                    print("      ✓ KEEP-ALIVE command sent")
+                    
+                    print(f"\n{'='*70}")
+                    print("✓ INITIALIZATION COMPLETE - Waiting for data stream...")
+                    print(f"{'='*70}\n")
+                    
+                except Exception as e:
+                    print(f"\n✗ Error during initialization: {e}")
+                    print("Continuing anyway - device may still stream...")
+            else:
+                print("\nWarning: No write characteristic - cannot send commands!")
             
-            keep_alive_task = asyncio.create_task(send_keep_alive())
-            print("[OK] Keep-alive loop started (1s interval)\n")
-        
-        print(f"{'='*70}")
-        print("STREAMING EEG DATA - Press Ctrl+C to stop")
-        print(f"{'='*70}\n")
-        
-        try:
-            # Stream for specified duration or indefinitely
-            if duration:
-                await asyncio.sleep(duration)
+            # Wait for data to start flowing
+            await asyncio.sleep(2)
+            
+            if processor.packet_count == 0:
+                print("\n[!] WARNING: No packets received after initialization!")
+                print("Troubleshooting:")
+                print("  1. Device may be in sleep mode - try power cycling")
+                print("  2. Check battery level")
+                print("  3. Make sure device is not connected to phone app")
+                print("\nContinuing to wait...")
             else:
-                # Run until interrupted
-                while True:
-                    await asyncio.sleep(1)
-        
-        except KeyboardInterrupt:
-            print("\n\nStopping stream...")
-        
-        finally:
-            # Cancel keep-alive
-            if keep_alive_task:
-                keep_alive_task.cancel()
+                print(f"\n✓ SUCCESS! Receiving data ({processor.packet_count} packets so far)")
             
-            # Send STOP command
+            # Start keep-alive loop (send every 1 second to maintain stream)
+            keep_alive_task = None
             if write_char_uuid:
-                try:
-                    await client.write_gatt_char(write_char_uuid, CMD_STOP_STREAM)
-                    print("[OK] STOP command sent")
-                except:
-                    pass
-            
-            # Stop notifications
-            await client.stop_notify(characteristic_uuid)
+                async def send_keep_alive():
+                    # Sleep to fixed deadlines so write latency doesn't accumulate
+                    # into drift over a long session
+                    try:
+                        deadline = loop.time()
+                        while True:
+                            deadline += KEEP_ALIVE_INTERVAL
+                            await asyncio.sleep(max(0.0, deadline - loop.time()))
+                            await client.write_gatt_char(write_char_uuid, CMD_KEEP_ALIVE, response=False)
+                    except:
+                        pass
+                
+                keep_alive_task = asyncio.create_task(send_keep_alive())
+                print("[OK] Keep-alive loop started (1s interval)\n")
             
-            # Print final statistics
-            stats = processor.get_statistics()
-            print(f"\n{'='*70}")
-            print("STREAM STATISTICS")
             print(f"{'='*70}")
-            print(f"Total Packets: {stats['packets']}")
-            print(f"Total Samples: {stats['samples']}")
-            print(f"Duration: {stats['duration']:.1f}s")
-            print(f"Packet Rate: {stats['packet_rate']:.1f} pkt/s")
-            print(f"Channels: {stats['channels']}")
-            print(f"Buffer Sizes: {stats['buffer_sizes']}")
+            print("STREAMING EEG DATA - Press Ctrl+C to stop")
             print(f"{'='*70}\n")
+            
+            try:
+                # Stream for specified duration or indefinitely
+                if duration:
+                    await asyncio.sleep(duration)
+                else:
+                    # Run until interrupted
+                    while True:
+                        await asyncio.sleep(1)
+            
+            except KeyboardInterrupt:
+                print("\n\nStopping stream...")
+            
+            finally:
+                # Cancel keep-alive
+                if keep_alive_task:
+                    keep_alive_task.cancel()
+                
+                # Send STOP command
+                if write_char_uuid:
+                    try:
+                        await client.write_gatt_char(write_char_uuid, CMD_STOP_STREAM)
+                        print("[OK] STOP command sent")
+                    except:
+                        pass
+                
+                # Stop notifications and let any running analysis finish
+                await client.stop_notify(characteristic_uuid)
+                if processor.analysis_tasks:
+                    await asyncio.gather(*processor.analysis_tasks, return_exceptions=True)
+                
+                # Final statistics go through the log queue too, so they follow
+                # any analysis reports still waiting to be written
+                stats = processor.get_statistics()
+                log.info('\n'.join([
+                    f"\n{'='*70}",
+                    "STREAM STATISTICS",
+                    f"{'='*70}",
+                    f"Total Packets: {stats['packets']}",
+                    f"Total Samples: {stats['samples']}",
+                    f"Duration: {stats['duration']:.1f}s",
+                    f"Packet Rate: {stats['packet_rate']:.1f} pkt/s",
+                    f"Channels: {stats['channels']}",
+                    f"Buffer Sizes: {stats['buffer_sizes']}",
+                    f"{'='*70}\n",
+                ]))
+        finally:
+            # Flushes whatever is still queued, however the stream ended
+            log_listener.stop()
 
 
 async def main():
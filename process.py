@@ -1,9 +1,18 @@
+import binascii
 import struct
+import sys
+from functools import lru_cache
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.fft import fft, fftfreq, rfft, rfftfreq
 from collections import deque
 
+try:
+    from numba import njit
+except ImportError:  # fall back to the NumPy Welch path
+    njit = None
+
 
 class EEGBuffer:
     """
@@ -28,11 +37,10 @@ class EEGBuffer:
         if packet_data['packet_type'] != 2:
             return
         
-        for sample in packet_data['samples']:
-            ch = sample['channel']
-            voltage = sample['voltage_uv']
-            self.channels[ch].append(voltage)
-            self.total_samples += 1
+        samples = packet_data['samples']
+        for ch, buf in self.channels.items():
+            buf.extend(samples['voltage_uv'][samples['channel'] == ch].tolist())
+        self.total_samples += packet_data['num_samples']
     
     def get_channel_data(self, channel):
         """Get buffered data for a specific channel"""
@@ -69,50 +77,174 @@ class EEGBuffer:
 
 
 import numpy as np
-from scipy.signal import butter, filtfilt, welch
+from scipy.signal import butter, filtfilt
+
+# Welch segment length and overlap used by calculate_band_powers
+WELCH_NPERSEG = 256
+WELCH_NOVERLAP = WELCH_NPERSEG // 2
+
+# EEG frequency bands (Hz), edges inclusive
+EEG_BANDS = {
+    'delta': (0.5, 4),
+    'theta': (4, 8),
+    'alpha': (8, 13),
+    'beta': (13, 30),
+    'gamma': (30, 41)
+}
+
+
+def _welch_frames(x, window, step, nseg):
+    """Mean-detrended, windowed Welch segments as an (nseg, nperseg) array"""
+    nperseg = len(window)
+    frames = np.empty((nseg, nperseg))
+    for s in range(nseg):
+        start = s * step
+        mean = 0.0
+        for i in range(nperseg):
+            mean += x[start + i]
+        mean /= nperseg
+        for i in range(nperseg):
+            frames[s, i] = (x[start + i] - mean) * window[i]
+    return frames
+
+
+def _welch_accumulate(spectra, scale, band_lo, band_hi):
+    """|X|² averaged over segments and scaled per bin, plus the sum of that
+    PSD over each band's [lo, hi) bin range, in one pass"""
+    nseg, nfreq = spectra.shape
+    pxx = np.empty(nfreq)
+    for k in range(nfreq):
+        acc = 0.0
+        for s in range(nseg):
+            z = spectra[s, k]
+            acc += z.real * z.real + z.imag * z.imag
+        pxx[k] = acc / nseg * scale[k]
+    powers = np.zeros(len(band_lo))
+    for b in range(len(band_lo)):
+        for k in range(band_lo[b], band_hi[b]):
+            powers[b] += pxx[k]
+    return pxx, powers
+
+
+def _welch_frames_numpy(x, window, step, nseg):
+    # Zero-copy (nseg, nperseg) view; the detrend below makes the one copy
+    frames = sliding_window_view(x, len(window))[::step][:nseg]
+    return (frames - frames.mean(axis=1, keepdims=True)) * window
+
+
+def _welch_accumulate_numpy(spectra, scale, band_lo, band_hi):
+    pxx = np.mean(spectra.real ** 2 + spectra.imag ** 2, axis=0) * scale
+    return pxx, np.array([pxx[lo:hi].sum() for lo, hi in zip(band_lo, band_hi)])
+
+
+if njit:
+    _welch_frames = njit(cache=True, fastmath=True)(_welch_frames)
+    _welch_accumulate = njit(cache=True, fastmath=True)(_welch_accumulate)
+else:
+    _welch_frames = _welch_frames_numpy
+    _welch_accumulate = _welch_accumulate_numpy
+
+
+@lru_cache(maxsize=16)
+def welch_plan(fs, nperseg, bands_lo, bands_hi):
+    """
+    Everything in a Welch pass that depends only on (fs, nperseg, bands):
+    Hann window, frequency axis, per-bin density scale and band bin ranges.
+    Cached, so a session computes it once rather than on every analysis;
+    the arrays are read-only because they are shared.
+    """
+    window = signal.get_window('hann', nperseg)
+    f = rfftfreq(nperseg, 1.0 / fs)
+    scale = np.full(len(f), 2.0 / (fs * np.sum(window ** 2)))
+    scale[0] /= 2  # DC has no mirror
+    if nperseg % 2 == 0:
+        scale[-1] /= 2  # nor does Nyquist
+    band_lo = np.searchsorted(f, bands_lo, side='left')
+    band_hi = np.searchsorted(f, bands_hi, side='right')
+    for arr in (window, f, scale, band_lo, band_hi):
+        arr.flags.writeable = False
+    return window, f, scale, band_lo, band_hi
+
+
+@lru_cache(maxsize=16)
+def bandpass_ba(lowcut, highcut, fs, order=4):
+    """Cached Butterworth bandpass (b, a) design"""
+    nyq = 0.5 * fs
+    b, a = butter(order, [lowcut / nyq, highcut / nyq], btype='band')
+    b.flags.writeable = False
+    a.flags.writeable = False
+    return b, a
+
+
+def welch_band_powers(x, fs, bands_lo, bands_hi, nperseg=WELCH_NPERSEG, noverlap=WELCH_NOVERLAP):
+    """
+    Welch PSD (Hann window, constant detrend, density scaling, mean of
+    segments, as scipy.signal.welch) and its sum over each band
+    
+    The segmenting and the |X|²/average/band-sum stages are Numba kernels
+    when Numba is installed; the batched real FFT between them stays in
+    scipy.fft, which Numba cannot call.
+    
+    Returns:
+        (freqs, Pxx, band powers aligned with bands_lo/bands_hi)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    nperseg = min(nperseg, len(x))
+    if noverlap >= nperseg:
+        raise ValueError('noverlap must be less than nperseg.')
+    step = nperseg - noverlap
+    nseg = (len(x) - noverlap) // step
+    
+    window, f, scale, band_lo, band_hi = welch_plan(fs, nperseg, tuple(bands_lo), tuple(bands_hi))
+    # The frames are scratch, so pocketfft may transform in place; its plan
+    # for this nperseg is cached after the first call
+    spectra = rfft(_welch_frames(x, window, step, nseg), axis=-1, overwrite_x=True)
+    Pxx, powers = _welch_accumulate(spectra, scale, band_lo, band_hi)
+    return f, Pxx, powers
 
-def calculate_band_powers(voltages, sampling_rate=83.33):
+
+def calculate_band_powers(voltages, sampling_rate=83.33, use_welch=True, mean=None):
     """
     Calculate brainwave band powers using Welch's method with bandpass filtering.
     
     Args:
-        voltages: List or array of voltage values (µV)
+        voltages: List or array of voltage values (µV); float64 arrays are used without copying
         sampling_rate: Per-channel sampling rate in Hz (default 83.33 Hz)
+        use_welch: Use Welch's averaged PSD; if False, a single Hann-windowed
+                   periodogram computed with a multi-threaded real FFT
+        mean: Mean of voltages if the caller already tracks it (e.g. a running
+              mean), saving a pass over the data; computed here if None
     
     Returns:
         Dictionary with band powers, ratios, and attention/relaxation metrics
     """
-    data = np.array(voltages)
-    data = data - np.mean(data)  # Remove DC offset
+    data = np.asarray(voltages, dtype=np.float64)
+    data = data - (np.mean(data) if mean is None else mean)  # Remove DC offset
     
     # --- Bandpass filter 1-40 Hz (adjusted for 83.33 Hz Nyquist of 41.665 Hz) ---
-    def butter_bandpass(lowcut, highcut, fs, order=4):
-        nyq = 0.5 * fs
-        low = lowcut / nyq
-        high = highcut / nyq
-        b, a = butter(order, [low, high], btype='band')
-        return b, a
-
-    b, a = butter_bandpass(1, 40, sampling_rate)
+    b, a = bandpass_ba(1, 40, sampling_rate)
     filtered_data = filtfilt(b, a, data)
     
-    # --- Welch PSD ---
-    f, Pxx = welch(filtered_data, fs=sampling_rate, nperseg=256, noverlap=128)
+    bands_lo, bands_hi = zip(*EEG_BANDS.values())
     
-    # Define frequency bands
-    bands = {
-        'delta': (0.5, 4),
-        'theta': (4, 8),
-        'alpha': (8, 13),
-        'beta': (13, 30),
-        'gamma': (30, 41)
-    }
+    if use_welch:
+        # --- Welch PSD, band powers summed in the same pass ---
+        f, Pxx, powers = welch_band_powers(filtered_data, sampling_rate,
+                                           bands_lo, bands_hi)
+    else:
+        # --- Periodogram (one-sided PSD density) ---
+        n = len(filtered_data)
+        window = signal.get_window('hann', n)
+        Pxx = np.abs(rfft(filtered_data * window, workers=-1)) ** 2
+        Pxx /= sampling_rate * np.sum(window ** 2)
+        Pxx[1:] *= 2  # fold in negative frequencies
+        if n % 2 == 0:
+            Pxx[-1] /= 2  # Nyquist bin has no mirror
+        f = rfftfreq(n, 1.0 / sampling_rate)
+        powers = [np.sum(Pxx[(f >= low) & (f <= high)]) for low, high in EEG_BANDS.values()]
     
     # Calculate band powers
-    band_powers = {}
-    for band, (low, high) in bands.items():
-        idx = np.where((f >= low) & (f <= high))[0]
-        band_powers[band] = np.sum(Pxx[idx]) if len(idx) > 0 else 0.0
+    band_powers = dict(zip(EEG_BANDS, powers))
     
     total_power = sum(band_powers.values())
     band_ratios = {band: (power / total_power)*100 if total_power>0 else 0.0 
@@ -150,16 +282,13 @@ def analyze_eeg_packet(packet_data):
     Returns:
         Dictionary with per-channel analysis
     """
-    if packet_data['packet_type'] != 2 or not packet_data['samples']:
+    if packet_data['packet_type'] != 2 or not packet_data['num_samples']:
         return None
     
     # Group samples by channel
-    channels = {}
-    for sample in packet_data['samples']:
-        ch = sample['channel']
-        if ch not in channels:
-            channels[ch] = []
-        channels[ch].append(sample['voltage_uv'])
+    samples = packet_data['samples']
+    channels = {int(ch): samples['voltage_uv'][samples['channel'] == ch]
+                for ch in np.unique(samples['channel'])}
     
     # Analyze each channel
     channel_analysis = {}
@@ -213,15 +342,79 @@ def print_eeg_analysis(channel_analysis):
     print(f"\n{'='*70}\n")
 
 
-def decode_serenibrain_packet(hex_string):
+SERENIBRAIN_MAGIC = b'DATA'
+SERENIBRAIN_HEADER_LEN = 12
+
+# Precompiled layouts: 'DATA' magic, type (2nd byte), channels (2nd byte),
+# little-endian uint32 payload size; plus the status words and timestamp
+SERENIBRAIN_HEADER = struct.Struct('<4sxBxBI')
+UINT32 = struct.Struct('<I')
+TIMESTAMP = struct.Struct('<d')
+
+# Decoded samples are stored as parallel arrays (one per field), not a list
+# of per-sample dicts, so per-channel selection is a single mask
+SAMPLE_FIELDS = ('sample_number', 'sample_index', 'channel', 'raw_value', 'voltage_uv', 'raw_hex')
+
+
+# One 7-byte EEG sample record: signed 24-bit little-endian value (low 16 bits
+# plus a signed high byte), a padding byte, a uint16 sample index and a
+# trailing byte that appears to be a channel marker or padding
+SAMPLE_RECORD_DTYPE = np.dtype([('lo', '<u2'), ('hi', 'i1'), ('pad', 'u1'),
+                                ('index', '<u2'), ('marker', 'u1')])
+SAMPLE_RECORD_SIZE = SAMPLE_RECORD_DTYPE.itemsize  # 7
+SAMPLE_METADATA_LEN = 10  # trailing metadata/timestamp bytes
+
+
+def _empty_samples():
+    return {
+        'sample_number': np.empty(0, dtype=np.int64),
+        'sample_index': np.empty(0, dtype=np.int64),
+        'channel': np.empty(0, dtype=np.int64),
+        'raw_value': np.empty(0, dtype=np.int64),
+        'voltage_uv': np.empty(0, dtype=np.float64),
+        'raw_hex': np.empty(0, dtype='<U14'),
+    }
+
+
+def samples_to_dicts(samples):
+    """Convert decoded sample arrays to a list of per-sample dicts (e.g. for JSON)"""
+    columns = [samples[field].tolist() for field in SAMPLE_FIELDS]
+    return [dict(zip(SAMPLE_FIELDS, row)) for row in zip(*columns)]
+
+
+def iter_channel_voltages(samples):
+    """
+    Yield (channel, voltages) for each channel in decoded sample arrays, in
+    order of first appearance; one mask per channel rather than per sample
+    """
+    channels = samples['channel']
+    unique, first_seen = np.unique(channels, return_index=True)
+    for ch in unique[np.argsort(first_seen)].tolist():
+        yield ch, samples['voltage_uv'][channels == ch]
+
+
+def quick_is_serenibrain(data):
+    """
+    Cheap check that raw bytes look like a Serenibrain packet
+    
+    Lets BLE handlers skip decode_serenibrain_packet (and its exceptions)
+    for unrelated notifications.
+    """
+    return len(data) >= SERENIBRAIN_HEADER_LEN and data[:4] == SERENIBRAIN_MAGIC
+
+
+def decode_serenibrain_packet(hex_string, adc_scale=100.0):
     """
     Decode Serenibrain Bluetooth EEG packets
     
     Args:
-        hex_string: Hex string like "44-41-54-41-00-02..." or raw bytes
+        hex_string: Raw bytes (preferred) or a hex string like "44-41-54-41-00-02..."
+        adc_scale: Raw ADC counts per µV (default 100)
     
     Returns:
-        Dictionary with decoded data
+        Dictionary with decoded data. 'samples' maps each name in
+        SAMPLE_FIELDS to a NumPy array with one entry per sample;
+        'num_samples' is their count.
     """
     # Convert hex string to bytes if needed
     if isinstance(hex_string, str):
@@ -232,75 +425,56 @@ def decode_serenibrain_packet(hex_string):
         data = hex_string
     
     # Parse header
-    header = data[0:4].decode('ascii')
-    packet_type = data[5]  # Second byte of the type field
-    num_channels = data[7]  # Second byte of the channels field
-    payload_size = struct.unpack('<I', data[8:12])[0]  # Little-endian uint32
+    magic, packet_type, num_channels, payload_size = SERENIBRAIN_HEADER.unpack_from(data)
+    header = magic.decode('ascii')
     
     result = {
         'header': header,
         'packet_type': packet_type,
         'num_channels': num_channels,
         'payload_size': payload_size,
-        'samples': []
+        'samples': _empty_samples(),
+        'num_samples': 0
     }
     
     # Type 0x01: Status/Info packet
     if packet_type == 1:
         device_model = data[12:17].decode('ascii', errors='ignore')
         result['device_model'] = device_model
-        result['raw_data'] = [struct.unpack('<I', data[i:i+4])[0] 
+        result['raw_data'] = [UINT32.unpack_from(data, i)[0]
                               for i in range(24, min(len(data), 40), 4)]
         return result
     
     # Type 0x02: EEG Data Stream
     elif packet_type == 2:
-        offset = 12
-        
         # Pattern analysis: Looking at multiple packets, it seems like
-        # samples are grouped by channel, not interleaved
-        samples = []
-        sample_num = 0
-        
-        while offset + 7 <= len(data) - 10:  # Leave last 10 bytes for metadata
-            # Read first 3 bytes as signed 24-bit integer (little-endian)
-            raw_value_bytes = data[offset:offset+3]
-            
-            # Combine 3 bytes into signed 24-bit value
-            value = raw_value_bytes[0] | (raw_value_bytes[1] << 8) | (raw_value_bytes[2] << 16)
-            
-            # Sign extension for 24-bit signed integer
-            if value & 0x800000:
-                value = value - 0x1000000
-            
-            # Next 4 bytes contain padding and sample info
-            # Bytes 3-4: 0x00 0x00
-            # Bytes 5-6: sample index (little-endian)
-            sample_idx = struct.unpack('<H', data[offset+4:offset+6])[0]
-            
-            # Byte 6: appears to be 0x00 (channel marker or padding)
-            channel_byte = data[offset+6]
-            
-            # Determine channel based on sample_idx
-            # With 3 channels, samples might be: Ch0, Ch1, Ch2, Ch0, Ch1, Ch2...
-            channel = sample_idx % num_channels
-            
-            # Voltage conversion - try scale of 100
-            voltage_uv = value / 100.0
-            
-            samples.append({
-                'sample_number': sample_num,
-                'sample_index': sample_idx,
-                'channel': channel,
-                'raw_value': value,
-                'voltage_uv': voltage_uv,
-                'raw_hex': data[offset:offset+7].hex()
-            })
-            
-            offset += 7
-            sample_num += 1
+        # samples are grouped by channel, not interleaved. Every whole
+        # record between the header and the trailing metadata is a sample,
+        # so read them all at once instead of unpacking byte by byte
+        n = max(0, (len(data) - SERENIBRAIN_HEADER_LEN - SAMPLE_METADATA_LEN) // SAMPLE_RECORD_SIZE)
         
-        result['samples'] = samples
+        if n:
+            # NumPy's % by zero quietly gives 0 (channel 0) instead of raising
+            if num_channels == 0:
+                raise ValueError("EEG data packet declares 0 channels")
+            records = np.frombuffer(data, dtype=SAMPLE_RECORD_DTYPE, count=n,
+                                    offset=SERENIBRAIN_HEADER_LEN)
+            # The signed high byte gives the 24-bit sign extension for free
+            raw_value = records['hi'].astype(np.int64) * 65536 + records['lo']
+            sample_index = records['index'].astype(np.int64)
+            end = SERENIBRAIN_HEADER_LEN + n * SAMPLE_RECORD_SIZE
+            raw_hex = binascii.hexlify(data[SERENIBRAIN_HEADER_LEN:end])
+            result['samples'] = {
+                'sample_number': np.arange(n, dtype=np.int64),
+                'sample_index': sample_index,
+                # Determine channel based on sample_idx
+                # With 3 channels, samples might be: Ch0, Ch1, Ch2, Ch0, Ch1, Ch2...
+                'channel': sample_index % num_channels,
+                'raw_value': raw_value,
+                'voltage_uv': raw_value / adc_scale,
+                'raw_hex': np.frombuffer(raw_hex, dtype=f'S{2 * SAMPLE_RECORD_SIZE}').astype(str),
+            }
+            result['num_samples'] = n
         
         # Last 10 bytes are metadata/timestamp
         if len(data) >= 10:
@@ -308,7 +482,7 @@ def decode_serenibrain_packet(hex_string):
             
             # Try to decode as timestamp (last 8 bytes might be double timestamp)
             try:
-                timestamp = struct.unpack('<d', data[-10:-2])[0]
+                timestamp = TIMESTAMP.unpack_from(data, len(data) - 10)[0]
                 result['timestamp'] = timestamp
             except:
                 pass
@@ -318,51 +492,44 @@ def decode_serenibrain_packet(hex_string):
     return result
 
 
+SAMPLE_ROW = '{:<4} {:<8} {:<4} {:<10} {:<15.2f} {}'.format
+
+
 def print_decoded_packet(packet_data):
     """Pretty print decoded packet"""
-    print(f"\n{'='*60}")
-    print(f"Header: {packet_data['header']}")
-    print(f"Packet Type: 0x{packet_data['packet_type']:02X}")
-    print(f"Channels: {packet_data['num_channels']}")
-    print(f"Payload Size: {packet_data['payload_size']} bytes")
+    # Build the whole report and write it once rather than one print per line
+    lines = [
+        f"\n{'='*60}",
+        f"Header: {packet_data['header']}",
+        f"Packet Type: 0x{packet_data['packet_type']:02X}",
+        f"Channels: {packet_data['num_channels']}",
+        f"Payload Size: {packet_data['payload_size']} bytes",
+    ]
     
     if packet_data['packet_type'] == 1:
-        print(f"Device Model: {packet_data.get('device_model', 'N/A')}")
-        print(f"Raw Data: {packet_data.get('raw_data', [])}")
+        lines.append(f"Device Model: {packet_data.get('device_model', 'N/A')}")
+        lines.append(f"Raw Data: {packet_data.get('raw_data', [])}")
     
     elif packet_data['packet_type'] == 2:
-        print(f"\nEEG Samples ({len(packet_data['samples'])} samples):")
-        print(f"{'#':<4} {'SampIdx':<8} {'Ch':<4} {'Raw':<10} {'Voltage (µV)':<15} {'Raw Hex'}")
-        print("-" * 70)
-        
-        for sample in packet_data['samples']:
-            print(f"{sample['sample_number']:<4} "
-                  f"{sample['sample_index']:<8} "
-                  f"{sample['channel']:<4} "
-                  f"{sample['raw_value']:<10} "
-                  f"{sample['voltage_uv']:<15.2f} "
-                  f"{sample['raw_hex']}")
-        
-        # Group by channel for statistics
-        channels = {}
-        for sample in packet_data['samples']:
-            ch = sample['channel']
-            if ch not in channels:
-                channels[ch] = []
-            channels[ch].append(sample['voltage_uv'])
+        samples = packet_data['samples']
+        lines.append(f"\nEEG Samples ({packet_data['num_samples']} samples):")
+        lines.append(f"{'#':<4} {'SampIdx':<8} {'Ch':<4} {'Raw':<10} {'Voltage (µV)':<15} {'Raw Hex'}")
+        lines.append("-" * 70)
+        lines.extend(SAMPLE_ROW(*row) for row in zip(*(samples[f].tolist() for f in SAMPLE_FIELDS)))
         
-        print(f"\nPer-Channel Statistics:")
-        for ch in sorted(channels.keys()):
-            voltages = channels[ch]
-            print(f"  Channel {ch}: Min={min(voltages):.2f}µV, Max={max(voltages):.2f}µV, "
-                  f"Avg={sum(voltages)/len(voltages):.2f}µV, Samples={len(voltages)}")
+        lines.append(f"\nPer-Channel Statistics:")
+        for ch in np.unique(samples['channel']).tolist():
+            voltages = samples['voltage_uv'][samples['channel'] == ch]
+            lines.append(f"  Channel {ch}: Min={voltages.min():.2f}µV, Max={voltages.max():.2f}µV, "
+                         f"Avg={voltages.mean():.2f}µV, Samples={len(voltages)}")
         
         if 'timestamp' in packet_data:
-            print(f"\nTimestamp: {packet_data['timestamp']}")
+            lines.append(f"\nTimestamp: {packet_data['timestamp']}")
         if 'metadata' in packet_data:
-            print(f"Metadata: {packet_data['metadata']}")
+            lines.append(f"Metadata: {packet_data['metadata']}")
     
-    print(f"{'='*60}\n")
+    lines.append(f"{'='*60}\n")
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 # Example usage with your data
@@ -430,8 +597,8 @@ while receiving_data:
 """)
     
     # Show summary statistics for EEG data
-    if decoded2['samples']:
-        voltages = [s['voltage_uv'] for s in decoded2['samples']]
+    if decoded2['num_samples']:
+        voltages = decoded2['samples']['voltage_uv'].tolist()
         print(f"\nOverall Voltage Statistics:")
         print(f"  Min: {min(voltages):.2f} µV")
         print(f"  Max: {max(voltages):.2f} µV")
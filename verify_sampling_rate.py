@@ -3,6 +3,7 @@ Verify Serenibrain EEG sampling rate and data processing
 """
 import asyncio
 import time
+from collections import Counter
 from bleak import BleakClient, BleakScanner
 from process import decode_serenibrain_packet
 
@@ -24,7 +25,7 @@ def notification_handler(sender, data):
     try:
         packet = decode_serenibrain_packet(data)
         if packet['packet_type'] == 2:
-            num_samples = len(packet['samples'])
+            num_samples = packet['num_samples']
             sample_counts.append(num_samples)
             total_samples += num_samples
             
@@ -41,13 +42,8 @@ def notification_handler(sender, data):
                 print(f"  Total samples: {total_samples}")
                 
                 # Show sample details from this packet
-                if packet['samples']:
-                    channels = {}
-                    for sample in packet['samples']:
-                        ch = sample['channel']
-                        if ch not in channels:
-                            channels[ch] = 0
-                        channels[ch] += 1
+                if num_samples:
+                    channels = dict(Counter(packet['samples']['channel'].tolist()))
                     print(f"  Channel distribution: {channels}")
     
     except Exception as e:
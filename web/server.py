@@ -16,7 +16,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from bleak import BleakClient, BleakScanner
-from process import decode_serenibrain_packet, calculate_band_powers
+from process import decode_serenibrain_packet, calculate_band_powers, samples_to_dicts
 
 app = FastAPI()
 
@@ -71,15 +71,15 @@ def notification_handler(sender, data):
         # Decode packet
         packet = decode_serenibrain_packet(data)
         
-        if packet['packet_type'] == 2 and packet['samples']:
+        if packet['packet_type'] == 2 and packet['num_samples']:
             timestamp = datetime.now().isoformat()
+            samples = packet['samples']
             
             # Add samples to buffers (per-channel, preserving temporal accuracy)
-            for sample in packet['samples']:
-                ch = sample['channel']
+            for ch, voltage in zip(samples['channel'].tolist(), samples['voltage_uv'].tolist()):
                 if ch not in channel_buffers:
                     channel_buffers[ch] = []
-                channel_buffers[ch].append(sample['voltage_uv'])
+                channel_buffers[ch].append(voltage)
                 
                 # Keep last 8 seconds per channel (83.33 Hz * 8 = ~667 samples per channel)
                 # Need at least 256 samples for Welch with nperseg=256
@@ -90,7 +90,7 @@ def notification_handler(sender, data):
             asyncio.create_task(manager.broadcast({
                 'type': 'samples',
                 'timestamp': timestamp,
-                'data': packet['samples']
+                'data': samples_to_dicts(samples)
             }))
             
             # Perform band analysis every 2 seconds